@@ -1,366 +1,53 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
 import time
 import base64
 import io
-import pickle
-import numpy as np
 import datetime
+import hmac
+import os
+import pickle
+import tempfile
+
+from catalog import LANGUAGES, THEMES, stylesheet
+from gauge import GAUGE_MODES, confidence_gauge_figure, confidence_gauge_svg
+from heart_core.tracing import get_tracer
+
+# plotly, pandas, numpy and the model stack (heart_core, sklearn) are imported inside
+# the pages that use them, so the welcome, login, tips and settings pages do not pay
+# for them on a cold start. `python -m heart_core importtime` checks the budget.
 
 # --- Helper functions for data loading and preprocessing ---
-def load_model():
-    """Loads the pre-trained heart disease prediction model."""
+def load_history_store():
+    """Returns the prediction history store shared by all sessions."""
+    import heart_core
+
+    return heart_core.get_history_store()
+
+
+def load_scoring_engine():
+    """Returns the scoring engine for the current model, or None if it is missing."""
+    import heart_core
+
     try:
-        with open("heart_model.pkl", "rb") as f:
-            model = pickle.load(f)
-        return model
+        return heart_core.get_registry().get_engine()
     except FileNotFoundError:
-        st.error("Error: The model file 'heart_model.pkl' was not found.")
+        st.error(f"Error: The model file '{os.path.basename(heart_core.default_model_path())}' was not found.")
+        return None
+    except (ValueError, EOFError, pickle.UnpicklingError) as e:
+        # A corrupt artifact, or an empty or truncated pickle.
+        st.error(f"Error: The model file could not be loaded ({e or type(e).__name__}).")
         return None
 
-# --- Translation and Theme Dictionaries ---
-LANGUAGES = {
-    "English": {
-        "title": "❤️ Heart Disease Risk Predictor",
-        "subtitle": "Predict heart disease risk using Machine Learning.",
-        "get_started": "Get Started",
-        "login_title": "Login / Sign Up",
-        "name": "Name",
-        "email": "Email",
-        "password": "Password",
-        "proceed": "Proceed",
-        "login_success": "Login successful! You can now access the dashboard.",
-        "login_error": "Please fill in all the details.",
-        "dashboard_welcome": "Welcome, {username}!",
-        "dashboard_subtitle": "Your health journey begins here.",
-        "check_risk": "Check Risk",
-        "check_risk_desc": "Input your clinical data for an instant risk assessment.",
-        "view_reports": "View Reports",
-        "view_reports_desc": "Review past predictions and download reports.",
-        "health_tips": "Health Tips",
-        "health_tips_desc": "Discover tips for a heart-healthy lifestyle.",
-        "predict_title": "Predict Your Risk",
-        "predict_subtitle": "Please fill in the correct information.",
-        "personal_info": "Personal Information",
-        "age": "Age",
-        "sex": "Sex",
-        "male": "Male",
-        "female": "Female",
-        "clinical_data": "Clinical Data",
-        "cp": "Chest Pain Type",
-        "cp_options": ['Typical Angina (0)', 'Atypical Angina (1)', 'Non-anginal Pain (2)', 'Asymptomatic (3)'],
-        "trestbps": "Resting Blood Pressure (trestbps)",
-        "chol": "Cholesterol (chol)",
-        "fbs": "Fasting Blood Sugar > 120 mg/dl",
-        "fbs_options": ['No (0)', 'Yes (1)'],
-        "restecg": "Resting ECG Results",
-        "restecg_options": ['Normal (0)', 'ST-T wave abnormality (1)', 'Left ventricular hypertrophy (2)'],
-        "thalach": "Maximum Heart Rate Achieved (thalach)",
-        "exang": "Exercise-induced Angina",
-        "exang_options": ['No (0)', 'Yes (1)'],
-        "oldpeak": "ST Depression (oldpeak)",
-        "slope": "Slope of ST Segment",
-        "slope_options": ['Upsloping (0)', 'Flat (1)', 'Downsloping (2)'],
-        "ca": "Number of Major Vessels (0-3)",
-        "thal": "Thalassemia",
-        "thal_options": ['Normal (0)', 'Fixed defect (1)', 'Reversible defect (2)'],
-        "predict_button": "Predict Risk",
-        "predicting": "Predicting...",
-        "result_title": "Prediction Result",
-        "high_risk": "High Risk Detected!",
-        "high_risk_msg": "Based on the data, there is a high risk of heart disease. Please consult a medical professional.",
-        "low_risk": "Low Risk!",
-        "low_risk_msg": "The model predicts a low risk. Maintain your healthy lifestyle!",
-        "confidence": "Confidence Score:",
-        "download_report": "Download Report",
-        "report_header": "Heart Disease Risk Prediction Report",
-        "report_pred": "Prediction:",
-        "report_conf": "Confidence:",
-        "reports_title": "Prediction Reports",
-        "reports_empty": "There are no reports yet. They will appear here after you make a prediction.",
-        "reports_back": "Go back to Predict Page",
-        "tips_title": "Health Tips",
-        "tips_subtitle": "Here are some tips to keep your heart healthy:",
-        "diet_tips": "Dietary Tips",
-        "diet_tip1_title": "Balanced Diet",
-        "diet_tip1_desc": "• Focus on a diet rich in **fruits, vegetables, and whole grains**. These provide essential vitamins, minerals, and fiber.",
-        "diet_tip2_title": "Healthy Fats",
-        "diet_tip2_desc": "• Reduce intake of **saturated fats** (found in red meat, butter) and opt for **healthy fats** like olive oil, avocados, and nuts.",
-        "diet_tip3_title": "Sodium and Sugar",
-        "diet_tip3_desc": "• Limit your salt intake to manage blood pressure. Be mindful of hidden sugars in processed foods.",
-        "exercise_tips": "Exercise Routines",
-        "exercise_tip1_title": "Aerobic Activity",
-        "exercise_tip1_desc": "• Aim for at least 150 minutes of **moderate-intensity aerobic activity** per week. This includes brisk walking, cycling, or swimming.",
-        "exercise_tip2_title": "Strength and Flexibility",
-        "exercise_tip2_desc": "• Incorporate **strength training** exercises twice a week to build muscle. Don't forget flexibility exercises like stretching or yoga.",
-        "exercise_tip3_title": "Stay Active",
-        "exercise_tip3_desc": "• Take short walks throughout the day to break up long periods of sitting. Small movements add up!",
-        "stress_tips": "Stress Management",
-        "stress_tip1_title": "Mindfulness",
-        "stress_tip1_desc": "• Practice **meditation, yoga, or mindfulness** to reduce stress. These activities can lower your heart rate and blood pressure.",
-        "stress_tip2_title": "Quality Sleep",
-        "stress_tip2_desc": "• Get adequate sleep (**7-8 hours per night**) for overall well-being. Poor sleep is linked to higher risk of heart disease.",
-        "stress_tip3_title": "Connect with Others",
-        "stress_tip3_desc": "• Spend time on hobbies and with loved ones to relax and find joy. A strong social network is great for heart health.",
-        "settings_title": "Settings",
-        "app_customization": "App Customization",
-        "theme": "Theme",
-        "language": "Language",
-        "lang_info": "Language changed to {lang}. (Note: Not all text is fully translated for this demonstration).",
-        "navigation": "Navigation",
-        "dashboard": "Dashboard",
-        "predict": "Predict",
-        "reports": "Reports",
-        "tips": "Tips",
-        "settings": "Settings",
-        "logout": "Logout",
-        "login_prompt": "Please log in to navigate the app.",
-        "app_footer": "Made by Amna",
-        "font_settings": "Font Settings",
-        "font_size": "Body Font Size",
-        "data_management": "Data Management",
-        "clear_history": "Clear history on logout",
-        "reset_app": "Reset Application",
-        "reset_info": "This will clear all data and restart the app.",
-        "patient_name_label": "Patient Name:"
-    },
-    "Hindi": {
-        "title": "❤️ हृदय रोग जोखिम भविष्यवक्ता",
-        "subtitle": "मशीन लर्निंग का उपयोग करके हृदय रोग के जोखिम की भविष्यवाणी करें।",
-        "get_started": "शुरू करें",
-        "login_title": "लॉगिन / साइन अप करें",
-        "name": "नाम",
-        "email": "ईमेल",
-        "password": "पासवर्ड",
-        "proceed": "आगे बढ़ें",
-        "login_success": "लॉगिन सफल रहा! अब आप डैशबोर्ड तक पहुंच सकते हैं।",
-        "login_error": "कृपया सभी विवरण भरें।",
-        "dashboard_welcome": "आपका स्वागत है, {username}!",
-        "dashboard_subtitle": "आपकी स्वास्थ्य यात्रा यहाँ से शुरू होती है।",
-        "check_risk": "जोखिम की जाँच करें",
-        "check_risk_desc": "त्वरित जोखिम मूल्यांकन के लिए अपना नैदानिक ​​डेटा दर्ज करें।",
-        "view_reports": "रिपोर्ट देखें",
-        "view_reports_desc": "पिछली भविष्यवाणियों की समीक्षा करें और रिपोर्ट डाउनलोड करें।",
-        "health_tips": "स्वास्थ्य युक्तियाँ",
-        "health_tips_desc": "स्वस्थ दिल के लिए युक्तियाँ खोजें।",
-        "predict_title": "अपने जोखिम का अनुमान लगाएं",
-        "predict_subtitle": "कृपया सही जानकारी भरें।",
-        "personal_info": "व्यक्तिगत जानकारी",
-        "age": "उम्र",
-        "sex": "लिंग",
-        "male": "पुरुष",
-        "female": "महिला",
-        "clinical_data": "नैदानिक ​​डेटा",
-        "cp": "सीने में दर्द का प्रकार",
-        "cp_options": ['विशिष्ट एनजाइना (0)', 'असामान्य एनजाइना (1)', 'गैर-एनजाइनल दर्द (2)', 'रोगसूचक (3)'],
-        "trestbps": "विश्राम रक्तचाप (trestbps)",
-        "chol": "कोलेस्ट्रॉल (chol)",
-        "fbs": "उपवास रक्त शर्करा > 120 मिलीग्राम/डीएल",
-        "fbs_options": ['नहीं (0)', 'हाँ (1)'],
-        "restecg": "विश्राम ईसीजी परिणाम",
-        "restecg_options": ['सामान्य (0)', 'एसटी-टी तरंग असामान्यता (1)', 'बाएं वेंट्रिकुलर अतिवृद्धि (2)'],
-        "thalach": "अधिकतम हृदय गति प्राप्त हुई (thalach)",
-        "exang": "व्यायाम-प्रेरित एनजाइना",
-        "exang_options": ['नहीं (0)', 'हाँ (1)'],
-        "oldpeak": "एसटी अवसाद (oldpeak)",
-        "slope": "एसटी खंड का ढलान",
-        "slope_options": ['ऊपर की ओर (0)', 'सपाट (1)', 'नीचे की ओर (2)'],
-        "ca": "प्रमुख वाहिकाओं की संख्या (0-3)",
-        "thal": "थैलेसीमिया",
-        "thal_options": ['सामान्य (0)', 'निश्चित दोष (1)', 'प्रतिवर्ती दोष (2)'],
-        "predict_button": "जोखिम का अनुमान लगाएं",
-        "predicting": "भविष्यवाणी हो रही है...",
-        "result_title": "भविष्यवाणी का परिणाम",
-        "high_risk": "उच्च जोखिम का पता चला!",
-        "high_risk_msg": "डेटा के आधार पर, हृदय रोग का उच्च जोखिम है। कृपया एक चिकित्सा पेशेवर से परामर्श करें।",
-        "low_risk": "कम जोखिम!",
-        "low_risk_msg": "मॉडल कम जोखिम की भविष्यवाणी करता है। अपनी स्वस्थ जीवनशैली बनाए रखें!",
-        "confidence": "आत्मविश्वास स्कोर:",
-        "download_report": "रिपोर्ट डाउनलोड करें",
-        "report_header": "हृदय रोग जोखिम भविष्यवाणी रिपोर्ट",
-        "report_pred": "भविष्यवाणी:",
-        "report_conf": "आत्मविश्वास:",
-        "reports_title": "भविष्यवाणी रिपोर्ट",
-        "reports_empty": "अभी तक कोई रिपोर्ट नहीं है। भविष्यवाणी करने के बाद वे यहां दिखाई देंगे।",
-        "reports_back": "अनुमान पृष्ठ पर वापस जाएं",
-        "tips_title": "स्वास्थ्य युक्तियाँ",
-        "tips_subtitle": "अपने दिल को स्वस्थ रखने के लिए कुछ युक्तियाँ यहाँ दी गई हैं:",
-        "diet_tips": "आहार संबंधी युक्तियाँ",
-        "diet_tip1_title": "संतुलित आहार",
-        "diet_tip1_desc": "• फल, सब्जियों और साबुत अनाज से भरपूर आहार पर ध्यान दें। ये आवश्यक विटामिन, खनिज और फाइबर प्रदान करते हैं।",
-        "diet_tip2_title": "स्वस्थ वसा",
-        "diet_tip2_desc": "• **संतृप्त वसा** (लाल मांस, मक्खन में पाए जाने वाले) का सेवन कम करें और जैतून का तेल, एवोकैडो और मेवे जैसे **स्वस्थ वसा** का विकल्प चुनें।",
-        "diet_tip3_title": "सोडियम और चीनी",
-        "diet_tip3_desc": "• रक्तचाप को नियंत्रित करने के लिए अपने नमक का सेवन सीमित करें। प्रसंस्कृत खाद्य पदार्थों में छिपी हुई शर्करा के प्रति सचेत रहें।",
-        "exercise_tips": "व्यायाम दिनचर्या",
-        "exercise_tip1_title": "एरोबिक गतिविधि",
-        "exercise_tip1_desc": "• प्रति सप्ताह कम से कम 150 मिनट **मध्यम-तीव्रता वाली एरोबिक गतिविधि** का लक्ष्य रखें। इसमें तेज चलना, साइकिल चलाना या तैराकी शामिल है।",
-        "exercise_tip2_title": "ताकत और लचीलापन",
-        "exercise_tip2_desc": "• मांसपेशियों के निर्माण के लिए सप्ताह में दो बार **शक्ति प्रशिक्षण** अभ्यास शामिल करें। स्ट्रेचिंग या योग जैसे लचीलेपन वाले व्यायामों को न भूलें।",
-        "exercise_tip3_title": "सक्रिय रहें",
-        "exercise_tip3_desc": "• लंबे समय तक बैठने से बचने के लिए दिन भर में छोटी सैर करें। छोटे-छोटे आंदोलन बहुत फायदेमंद होते हैं!",
-        "stress_tips": "तनाव प्रबंधन",
-        "stress_tip1_title": "माइंडफुलनेस",
-        "stress_tip1_desc": "• तनाव कम करने के लिए **ध्यान, योग या माइंडफुलनेस** का अभ्यास करें। ये गतिविधियाँ आपकी हृदय गति और रक्तचाप को कम कर सकती हैं।",
-        "stress_tip2_title": "गुणवत्तापूर्ण नींद",
-        "stress_tip2_desc": "• समग्र कल्याण के लिए पर्याप्त नींद लें (**प्रति रात 7-8 घंटे**)। खराब नींद हृदय रोग के उच्च जोखिम से जुड़ी है।",
-        "stress_tip3_title": "दूसरों से जुड़ें",
-        "stress_tip3_desc": "• आराम करने और आनंद पाने के लिए शौक और प्रियजनों के साथ समय बिताएं। एक मजबूत सामाजिक नेटवर्क दिल के स्वास्थ्य के लिए बहुत अच्छा है।",
-        "settings_title": "सेटिंग्स",
-        "app_customization": "ऐप अनुकूलन",
-        "theme": "थीम",
-        "language": "भाषा",
-        "lang_info": "भाषा बदलकर {lang} हो गई। (नोट: इस प्रदर्शन के लिए सभी पाठों का पूरी तरह से अनुवाद नहीं किया गया है)।",
-        "navigation": "नेविगेशन",
-        "dashboard": "डैशबोर्ड",
-        "predict": "अनुमान",
-        "reports": "रिपोर्ट",
-        "tips": "युक्तियाँ",
-        "settings": "सेटिंग्स",
-        "logout": "लॉग आउट",
-        "login_prompt": "ऐप नेविगेट करने के लिए कृपया लॉग इन करें।",
-        "app_footer": "अम्ना द्वारा बनाया गया",
-        "font_settings": "फ़ॉन्ट सेटिंग्स",
-        "font_size": "बॉडी फ़ॉन्ट का आकार",
-        "data_management": "डेटा प्रबंधन",
-        "clear_history": "लॉग आउट पर इतिहास साफ़ करें",
-        "reset_app": "एप्लिकेशन रीसेट करें",
-        "reset_info": "यह सभी डेटा साफ़ कर देगा और ऐप को पुनरारंभ करेगा।",
-        "patient_name_label": "रोगी का नाम:"
-    },
-    "Spanish": {
-        "title": "❤️ Predictor de Riesgo de Enfermedad Cardíaca",
-        "subtitle": "Predice el riesgo de enfermedad cardíaca usando Machine Learning.",
-        "get_started": "Comenzar",
-        "login_title": "Iniciar Sesión / Registrarse",
-        "name": "Nombre",
-        "email": "Correo electrónico",
-        "password": "Contraseña",
-        "proceed": "Proceder",
-        "login_success": "¡Inicio de sesión exitoso! Ahora puedes acceder al panel de control.",
-        "login_error": "Por favor, completa todos los detalles.",
-        "dashboard_welcome": "¡Bienvenido, {username}!",
-        "dashboard_subtitle": "Tu viaje de salud comienza aquí.",
-        "check_risk": "Verificar Riesgo",
-        "check_risk_desc": "Ingresa tus datos clínicos para una evaluación de riesgo instantánea.",
-        "view_reports": "Ver Informes",
-        "view_reports_desc": "Revisa predicciones pasadas y descarga informes.",
-        "health_tips": "Consejos de Salud",
-        "health_tips_desc": "Descubre consejos para un estilo de vida saludable para el corazón.",
-        "predict_title": "Predice Tu Riesgo",
-        "predict_subtitle": "Por favor, completa la información correcta.",
-        "personal_info": "Información Personal",
-        "age": "Edad",
-        "sex": "Sexo",
-        "male": "Masculino",
-        "female": "Femenino",
-        "clinical_data": "Datos Clínicos",
-        "cp": "Tipo de Dolor de Pecho",
-        "cp_options": ['Angina Típica (0)', 'Angina Atípica (1)', 'Dolor no Anginal (2)', 'Asintomático (3)'],
-        "trestbps": "Presión Arterial en Reposo (trestbps)",
-        "chol": "Colesterol (chol)",
-        "fbs": "Azúcar en la Sangre en Ayunas > 120 mg/dl",
-        "fbs_options": ['No (0)', 'Sí (1)'],
-        "restecg": "Resultados de ECG en Reposo",
-        "restecg_options": ['Normal (0)', 'Anomalía de la onda ST-T (1)', 'Hipertrofia ventricular izquierda (2)'],
-        "thalach": "Frecuencia Cardíaca Máxima Alcanzada (thalach)",
-        "exang": "Angina Inducida por Ejercicio",
-        "exang_options": ['No (0)', 'Sí (1)'],
-        "oldpeak": "Depresión ST (oldpeak)",
-        "slope": "Pendiente del Segmento ST",
-        "slope_options": ['Ascendente (0)', 'Plana (1)', 'Descendente (2)'],
-        "ca": "Número de Vasos Mayores (0-3)",
-        "thal": "Talasemia",
-        "thal_options": ['Normal (0)', 'Defecto Fijo (1)', 'Defecto Reversible (2)'],
-        "predict_button": "Predecir Riesgo",
-        "predicting": "Prediciendo...",
-        "result_title": "Resultado de la Predicción",
-        "high_risk": "¡Riesgo Alto Detectado!",
-        "high_risk_msg": "Según los datos, existe un alto riesgo de enfermedad cardíaca. Por favor, consulta a un profesional médico.",
-        "low_risk": "¡Riesgo Bajo!",
-        "low_risk_msg": "El modelo predice un riesgo bajo. ¡Mantén tu estilo de vida saludable!",
-        "confidence": "Puntuación de Confianza:",
-        "download_report": "Descargar Informe",
-        "report_header": "Informe de Predicción de Riesgo de Enfermedad Cardíaca",
-        "report_pred": "Predicción:",
-        "report_conf": "Confianza:",
-        "reports_title": "Informes de Predicción",
-        "reports_empty": "Aún no hay informes. Aparecerán aquí después de que hagas una predicción.",
-        "reports_back": "Volver a la página de Predicción",
-        "tips_title": "Consejos de Salud",
-        "tips_subtitle": "Aquí tienes algunos consejos para mantener tu corazón saludable:",
-        "diet_tips": "Consejos Dietéticos",
-        "diet_tip1_title": "Dieta Equilibrada",
-        "diet_tip1_desc": "• Concéntrate en una dieta rica en **frutas, verduras y granos enteros**. Estos proporcionan vitaminas, minerales y fibra esenciales.",
-        "diet_tip2_title": "Grasas Saludables",
-        "diet_tip2_desc": "• Reduce la ingesta de **grasas saturadas** (que se encuentran en la carne roja, mantequilla) y opta por **grasas saludables** como el aceite de oliva, aguacates y nueces.",
-        "diet_tip3_title": "Sodio y Azúcar",
-        "diet_tip3_desc": "• Limita tu ingesta de sal para controlar la presión arterial. Ten cuidado con los azúcares ocultos en los alimentos procesados.",
-        "exercise_tips": "Rutinas de Ejercicio",
-        "exercise_tip1_title": "Actividad Aeróbica",
-        "exercise_tip1_desc": "• Aspira a al menos 150 minutos de **actividad aeróbica de intensidad moderada** por semana. Esto incluye caminar a paso ligero, andar en bicicleta o nadar.",
-        "exercise_tip2_title": "Fuerza y Flexibilidad",
-        "exercise_tip2_desc": "• Incorpora ejercicios de **entrenamiento de fuerza** dos veces por semana para construir músculo. No olvides los ejercicios de flexibilidad como el estiramiento o el yoga.",
-        "exercise_tip3_title": "Mantente Activo",
-        "exercise_tip3_desc": "• Da paseos cortos durante el día para interrumpir largos períodos de estar sentado. ¡Los pequeños movimientos suman!",
-        "stress_tips": "Manejo del Estrés",
-        "stress_tip1_title": "Atención Plena",
-        "stress_tip1_desc": "• Practica **meditación, yoga o mindfulness** para reducir el estrés. Estas actividades pueden disminuir tu frecuencia cardíaca y presión arterial.",
-        "stress_tip2_title": "Sueño de Calidad",
-        "stress_tip2_desc": "• Duerme lo suficiente (**7-8 horas por noche**) para el bienestar general. La falta de sueño está relacionada con un mayor riesgo de enfermedad cardíaca.",
-        "stress_tip3_title": "Conecta con Otros",
-        "stress_tip3_desc": "• Dedica tiempo a pasatiempos y a tus seres queridos para relajarte y encontrar alegría. Una red social fuerte es excelente para la salud del corazón.",
-        "settings_title": "Configuración",
-        "app_customization": "Personalización de la aplicación",
-        "theme": "Tema",
-        "language": "Idioma",
-        "lang_info": "Idioma cambiado a {lang}. (Nota: el contenido del texto no está completamente traducido para esta demostración).",
-        "navigation": "Navegación",
-        "dashboard": "Panel",
-        "predict": "Predecir",
-        "reports": "Informes",
-        "tips": "Consejos",
-        "settings": "Configuración",
-        "logout": "Cerrar Sesión",
-        "login_prompt": "Por favor, inicia sesión para navegar por la aplicación.",
-        "app_footer": "Hecho por Amna",
-        "font_settings": "Configuración de la Fuente",
-        "font_size": "Tamaño de la Fuente del Cuerpo",
-        "data_management": "Gestión de Datos",
-        "clear_history": "Borrar historial al cerrar sesión",
-        "reset_app": "Reiniciar la Aplicación",
-        "reset_info": "Esto borrará todos los datos y reiniciará la aplicación.",
-        "patient_name_label": "Nombre del Paciente:"
-    }
-}
-
-THEMES = {
-    "Dark": {
-        "primary": "#DC2626",
-        "background": "#121212",
-        "secondary_bg": "#1F1F1F",
-        "text_color": "#FFFFFF"
-    },
-    "Light": {
-        "primary": "#DC2626",
-        "background": "#FFFFFF",
-        "secondary_bg": "#F0F2F6",
-        "text_color": "#000000"
-    },
-    "Blue": {
-        "primary": "#3B82F6",
-        "background": "#095CAA",
-        "secondary_bg": "#324C80",
-        "text_color": "#DCE5F1"
-    },
-    "Green": {
-        "primary": "#10B981",
-        "background": "#3AC25E",
-        "secondary_bg": "#D1FAE5",
-        "text_color": "#1F2937"
-    }
-}
+REPORTS_PAGE_SIZE = 20
+# Most PDF reports the in-app ZIP export will bundle; Streamlit holds a download in memory.
+MAX_REPORT_EXPORT = int(os.environ.get('HEART_MAX_REPORT_EXPORT', '1000'))
+# Most records the in-app CSV and Parquet exports will include; larger exports go
+# through `python -m heart_core history`, which streams to a file.
+MAX_HISTORY_EXPORT = int(os.environ.get('HEART_MAX_HISTORY_EXPORT', '100000'))
+# Seconds the live preview waits after a form change before scoring it.
+PREVIEW_DEBOUNCE = 0.3
+# Re-measurements the uncertainty panel can simulate per prediction.
+UNCERTAINTY_SAMPLES = [10000, 20000, 50000, 100000]
 
 # --- Session State Initialization ---
 if 'page' not in st.session_state:
@@ -375,18 +62,33 @@ if 'language' not in st.session_state:
     st.session_state.language = 'English'
 if 'prediction_result' not in st.session_state:
     st.session_state.prediction_result = None
-if 'prediction_history' not in st.session_state:
-    st.session_state.prediction_history = []
+if 'reports_page_index' not in st.session_state:
+    st.session_state.reports_page_index = 0
 if 'font_size' not in st.session_state:
     st.session_state.font_size = 14
+if 'gauge_mode' not in st.session_state:
+    st.session_state.gauge_mode = 'svg'
 if 'clear_history_on_logout' not in st.session_state:
     st.session_state.clear_history_on_logout = False
+if 'bulk_result' not in st.session_state:
+    st.session_state.bulk_result = None
+if 'live_preview_result' not in st.session_state:
+    st.session_state.live_preview_result = None
+if 'is_admin' not in st.session_state:
+    st.session_state.is_admin = False
+# True only while the whole script is running; a fragment rerun finds it False.
+if 'full_run' not in st.session_state:
+    st.session_state.full_run = False
 
 # --- Page Navigation Functions ---
 def set_page(page_name):
     """Function to change the current page in session state."""
     st.session_state.page = page_name
 
+def set_reports_page(page_index):
+    """Moves the reports page to the given page of history."""
+    st.session_state.reports_page_index = page_index
+
 def add_footer():
     """Adds a footer to the page."""
     lang = LANGUAGES[st.session_state.language]
@@ -394,17 +96,30 @@ def add_footer():
     st.markdown(f"<p style='text-align: center; font-size: 0.8em; color: gray;'>{lang['app_footer']}</p>", unsafe_allow_html=True)
 
 
+def clear_bulk_result():
+    """Drops the bulk scoring output, deleting its temporary file."""
+    if st.session_state.bulk_result:
+        st.session_state.bulk_result['file'].close()
+    st.session_state.bulk_result = None
+
+
 def reset_app():
-    """Resets all session state variables."""
+    """Resets all session state variables and deletes the logged-in user's history."""
+    if st.session_state.username:
+        load_history_store().clear(st.session_state.username)
     st.session_state.page = 'welcome'
     st.session_state.logged_in = False
     st.session_state.username = ''
     st.session_state.prediction_result = None
-    st.session_state.prediction_history = []
+    st.session_state.reports_page_index = 0
+    clear_bulk_result()
+    st.session_state.live_preview_result = None
+    st.session_state.is_admin = False
     st.session_state.font_size = 14
     st.session_state.clear_history_on_logout = False
     st.session_state.theme_mode = 'Dark'
     st.session_state.language = 'English'
+    st.session_state.gauge_mode = 'svg'
 
 
 def welcome_page():
@@ -416,7 +131,7 @@ def welcome_page():
         st.markdown(f"<p style='text-align: center; font-size: 1.25rem; color: {THEMES[st.session_state.theme_mode]['text_color']};'>{lang['subtitle']}</p>", unsafe_allow_html=True)
         
         st.markdown("<br>", unsafe_allow_html=True)
-        if st.button(lang['get_started'], use_container_width=True):
+        if st.button(lang['get_started'], width='stretch'):
             set_page('login')
     add_footer()
 
@@ -434,14 +149,17 @@ def login_page():
             submitted = st.form_submit_button(lang['proceed'])
             
             if submitted:
-                if username and email and password:
+                if not (username and email and password):
+                    st.error(lang['login_error'])
+                # History is keyed on the name, so a name is bound to the first credentials used with it.
+                elif not load_history_store().authenticate(username, email, password):
+                    st.error(lang['login_denied'])
+                else:
                     st.session_state.logged_in = True
                     st.session_state.username = username
                     st.session_state.page = 'dashboard'
                     st.success(lang['login_success'])
                     st.rerun()
-                else:
-                    st.error(lang['login_error'])
     add_footer()
 
 def dashboard_page():
@@ -458,19 +176,72 @@ def dashboard_page():
         with st.container(border=True):
             st.markdown(f"### {lang['check_risk']}")
             st.markdown(lang['check_risk_desc'])
-            st.button(lang['predict_button'], on_click=lambda: set_page('predict'), use_container_width=True)
+            st.button(lang['predict_button'], on_click=lambda: set_page('predict'), width='stretch')
     with col2:
         with st.container(border=True):
             st.markdown(f"### {lang['view_reports']}")
             st.markdown(lang['view_reports_desc'])
-            st.button(lang['reports'], on_click=lambda: set_page('reports'), use_container_width=True)
+            st.button(lang['reports'], on_click=lambda: set_page('reports'), width='stretch')
     with col3:
         with st.container(border=True):
             st.markdown(f"### {lang['health_tips']}")
             st.markdown(lang['health_tips_desc'])
-            st.button(lang['health_tips'], on_click=lambda: set_page('tips'), use_container_width=True)
+            st.button(lang['health_tips'], on_click=lambda: set_page('tips'), width='stretch')
+
+    with get_tracer().span('analytics'):
+        analytics_section()
     add_footer()
 
+def analytics_section():
+    """Renders the user's cohort analytics from the store's running aggregates."""
+    # Figures are only built and sent while the panel is open.
+    lang = LANGUAGES[st.session_state.language]
+    panel = st.expander(lang['analytics_title'], expanded=False, key='analytics_panel', on_change="rerun")
+    if not panel.open:
+        return
+
+    import heart_core
+    import plotly.graph_objects as go
+
+    # Reads a fixed number of aggregate rows, never the predictions themselves.
+    cohort = load_history_store().cohort(st.session_state.username)
+    with panel:
+        if not cohort.total:
+            st.markdown(lang['analytics_empty'])
+            return
+        total_col, rate_col, confidence_col = st.columns(3)
+        total_col.metric(lang['analytics_total'], f"{cohort.total:,}")
+        rate_col.metric(lang['analytics_high_rate'], f"{cohort.high_risk_rate * 100:.1f}%")
+        confidence_col.metric(lang['analytics_mean_confidence'], f"{cohort.mean_confidence * 100:.1f}%")
+
+        primary = THEMES[st.session_state.theme_mode]['primary']
+        days, rate = cohort.daily_high_risk_rate()
+        fig = go.Figure(go.Scatter(x=days, y=rate, mode='lines+markers', line_color=primary))
+        fig.update_layout(margin=dict(t=30, b=0, l=0, r=0), height=260, title=lang['analytics_daily'],
+                          yaxis_range=[0, 1], yaxis_tickformat='.0%')
+        st.plotly_chart(fig, width='stretch')
+
+        features = {feature.name: feature for feature in heart_core.FEATURES}
+        metric_labels = {name: lang[name] for name in features}
+        metric_labels['confidence'] = lang['analytics_confidence']
+        metric = st.selectbox(lang['analytics_metric'], options=list(metric_labels), format_func=metric_labels.get,
+                              key='analytics_metric')
+        buckets, low, high = cohort.histogram(metric)
+        if metric in features and features[metric].codes is not None:
+            names = heart_core.feature_labels(features[metric], lang)
+        else:
+            names = [f"{bucket:g}" for bucket in buckets]
+        fig = go.Figure([
+            go.Bar(x=names, y=low, name=lang['risk_low_label'], marker_color='#34D399'),
+            go.Bar(x=names, y=high, name=lang['risk_high_label'], marker_color=primary),
+        ])
+        fig.update_layout(barmode='group', margin=dict(t=10, b=0, l=0, r=0), height=300, xaxis_title=metric_labels[metric])
+        st.plotly_chart(fig, width='stretch')
+
+        means = [cohort.mean(metric, is_high_risk) for is_high_risk in (False, True)]
+        st.caption(lang['analytics_means'].format(
+            low='–' if means[0] is None else f"{means[0]:.2f}", high='–' if means[1] is None else f"{means[1]:.2f}"))
+
 def prediction_page():
     """Renders the prediction form and results."""
     lang = LANGUAGES[st.session_state.language]
@@ -478,82 +249,113 @@ def prediction_page():
     st.markdown(f"<p>{lang['predict_subtitle']}</p>", unsafe_allow_html=True)
     
     st.markdown("---")
-    
+
+    tracer = get_tracer()
     # Load the model
-    model = load_model()
+    with tracer.span('load_model'):
+        engine = load_scoring_engine()
+
+    prediction_form(engine)
+
+    with tracer.span('bulk_scoring'):
+        bulk_scoring_section(engine)
+    add_footer()
+
+@st.fragment
+def prediction_form(engine):
+    """Renders the prediction form and result as a fragment, so editing the form reruns only this part of the page."""
+    tracer = get_tracer()
+    if not st.session_state.full_run:
+        tracer.count_run('predict', 'fragment')
+        with tracer.rerun('predict', 'fragment_rerun'):
+            render_prediction_form(engine)
+    else:
+        with tracer.span('form'):
+            render_prediction_form(engine)
+
+def render_prediction_form(engine):
+    """Renders the form inputs, the live preview, the predict button and the latest result."""
+    import heart_core
+
+    lang = LANGUAGES[st.session_state.language]
+    tracer = get_tracer()
 
     def predict_risk(data):
         """Makes a prediction using the loaded ML model."""
-        if not model:
+        if not engine:
             return None, None
-        # Convert data dictionary to DataFrame
-        input_df = pd.DataFrame([data], columns=['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'])
-        
-        # Make a prediction
-        prediction = model.predict(input_df)[0]
-        # Get the confidence score (probability of the predicted class)
-        probabilities = model.predict_proba(input_df)[0]
-        confidence = probabilities[prediction]
-        
-        is_high_risk = bool(prediction == 1) # Assuming 1 is the high-risk class
-        return is_high_risk, confidence
+        # Scored by the process-wide batcher together with other sessions' requests.
+        return heart_core.get_inference_batcher().predict_risk(data)
+
+    ranges = heart_core.FEATURE_RANGES
+    features = {feature.name: feature for feature in heart_core.FEATURES}
+
+    def code_input(widget, column, options=None):
+        """Renders a categorical input whose value is the feature code, shown with its translated label."""
+        feature = features[column]
+        labels = dict(zip(feature.codes, heart_core.feature_labels(feature, lang)))
+        return widget(lang[column], options=options or feature.codes, format_func=labels.get)
 
     # --- Form Input Sections ---
     with st.expander(lang['personal_info'], expanded=True):
         age_col, sex_col = st.columns(2)
         with age_col:
-            age = st.number_input(lang['age'], min_value=1, max_value=120, value=30)
+            age = st.number_input(lang['age'], min_value=ranges['age'][0], max_value=ranges['age'][1], value=30)
         with sex_col:
-            sex_options_display = [lang['male'], lang['female']]
-            sex = st.selectbox(lang['sex'], options=sex_options_display)
-            sex_encoded = 1 if sex == lang['male'] else 0
+            sex = code_input(st.selectbox, 'sex', options=[1, 0])
 
     with st.expander(lang['clinical_data'], expanded=True):
         col_c1, col_c2 = st.columns(2)
         with col_c1:
-            cp = st.selectbox(lang['cp'], options=lang['cp_options'])
-            trestbps = st.number_input(lang['trestbps'], min_value=50, max_value=250, value=120)
-            chol = st.number_input(lang['chol'], min_value=100, max_value=600, value=200)
-            fbs = st.radio(lang['fbs'], options=lang['fbs_options'])
+            cp = code_input(st.selectbox, 'cp')
+            trestbps = st.number_input(lang['trestbps'], min_value=ranges['trestbps'][0], max_value=ranges['trestbps'][1], value=120)
+            chol = st.number_input(lang['chol'], min_value=ranges['chol'][0], max_value=ranges['chol'][1], value=200)
+            fbs = code_input(st.radio, 'fbs')
 
         with col_c2:
-            restecg = st.selectbox(lang['restecg'], options=lang['restecg_options'])
-            thalach = st.number_input(lang['thalach'], min_value=60, max_value=220, value=150)
-            exang = st.radio(lang['exang'], options=lang['exang_options'])
-            oldpeak = st.number_input(lang['oldpeak'], min_value=0.0, max_value=6.2, value=1.0)
-            slope = st.selectbox(lang['slope'], options=lang['slope_options'])
-            ca = st.selectbox(lang['ca'], options=['0', '1', '2', '3'])
-            thal = st.selectbox(lang['thal'], options=lang['thal_options'])
-
-    if st.button(lang['predict_button'], use_container_width=True):
-        user_data = {
-            'age': age,
-            'sex': sex_encoded,
-            'cp': int(cp[-2]),
-            'trestbps': trestbps,
-            'chol': chol,
-            'fbs': int(fbs[-2]),
-            'restecg': int(restecg[-2]),
-            'thalach': thalach,
-            'exang': int(exang[-2]),
-            'oldpeak': oldpeak,
-            'slope': int(slope[-2]),
-            'ca': int(ca),
-            'thal': int(thal[-2])
-        }
-        
-        with st.spinner(lang['predicting']):
+            restecg = code_input(st.selectbox, 'restecg')
+            thalach = st.number_input(lang['thalach'], min_value=ranges['thalach'][0], max_value=ranges['thalach'][1], value=150)
+            exang = code_input(st.radio, 'exang')
+            oldpeak = st.number_input(lang['oldpeak'], min_value=ranges['oldpeak'][0], max_value=ranges['oldpeak'][1], value=1.0)
+            slope = code_input(st.selectbox, 'slope')
+            ca = code_input(st.selectbox, 'ca')
+            thal = code_input(st.selectbox, 'thal')
+
+    user_data = {
+        'age': age,
+        'sex': sex,
+        'cp': cp,
+        'trestbps': trestbps,
+        'chol': chol,
+        'fbs': fbs,
+        'restecg': restecg,
+        'thalach': thalach,
+        'exang': exang,
+        'oldpeak': oldpeak,
+        'slope': slope,
+        'ca': ca,
+        'thal': thal
+    }
+
+    if st.toggle(lang['live_preview'], key='live_preview', help=lang['live_preview_help']) and engine:
+        live_preview(user_data, predict_risk)
+
+    if st.button(lang['predict_button'], width='stretch'):
+        with st.spinner(lang['predicting']), tracer.span('predict'):
             is_high_risk, confidence = predict_risk(user_data)
         
-        prediction_record = {
-            'username': st.session_state.username,
-            'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'is_high_risk': is_high_risk,
-            'confidence': confidence,
-            'data': user_data
-        }
+        # Kept in session state for the rest of the visit, so it is stored compactly.
+        prediction_record = heart_core.PredictionRecord(
+            username=st.session_state.username,
+            timestamp=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            is_high_risk=is_high_risk,
+            confidence=confidence,
+            data=user_data
+        )
         st.session_state.prediction_result = prediction_record
-        st.session_state.prediction_history.append(prediction_record)
+        with tracer.span('history_append'):
+            load_history_store().append(prediction_record)
+        heart_core.get_report_renderer().submit(prediction_record)
 
     # --- Prediction Result Display ---
     if st.session_state.prediction_result:
@@ -576,85 +378,369 @@ def prediction_page():
             """, unsafe_allow_html=True)
 
         # Confidence Score Chart
-        fig = go.Figure(data=[go.Pie(
-            labels=[lang['confidence'], ''],
-            values=[result['confidence'], 1 - result['confidence']],
-            marker_colors=[THEMES[st.session_state.theme_mode]['primary'], '#D1D5DB'],
-            hole=0.5
-        )])
-        fig.update_layout(showlegend=False, margin=dict(t=0, b=0, l=0, r=0))
-        st.plotly_chart(fig, use_container_width=True)
+        with tracer.span('chart'):
+            if st.session_state.gauge_mode == 'plotly':
+                fig = confidence_gauge_figure(result['confidence'], st.session_state.theme_mode, lang['confidence'])
+                st.plotly_chart(fig, width='stretch')
+            else:
+                st.markdown(confidence_gauge_svg(result['confidence'], st.session_state.theme_mode, lang['confidence']),
+                            unsafe_allow_html=True)
         st.markdown(f"<p style='text-align: center;'><b>{lang['confidence']}</b> {result['confidence']*100:.2f}%</p>", unsafe_allow_html=True)
 
-        # Download Report Button
-        report_text = f"""
-{lang['report_header']}
-------------------------------------
-{lang['patient_name_label']} {result['username']}
-{lang['report_pred']} {'High Risk' if result['is_high_risk'] else 'Low Risk'}
-{lang['report_conf']} {result['confidence']:.2f}
-
-Patient Data:
-Age: {result['data']['age']}
-Sex: {'Male' if result['data']['sex'] == 1 else 'Female'}
-Chest Pain Type: {result['data']['cp']}
-Resting Blood Pressure: {result['data']['trestbps']}
-Cholesterol: {result['data']['chol']}
-Fasting Blood Sugar > 120 mg/dl: {result['data']['fbs']}
-Resting ECG Results: {result['data']['restecg']}
-Maximum Heart Rate Achieved: {result['data']['thalach']}
-Exercise-induced Angina: {result['data']['exang']}
-ST Depression: {result['data']['oldpeak']}
-Slope of ST Segment: {result['data']['slope']}
-Number of Major Vessels: {result['data']['ca']}
-Thalassemia: {result['data']['thal']}
-------------------------------------
-"""
+        if engine:
+            with tracer.span('sensitivity'):
+                sensitivity_section(engine, result['data'])
+            if engine.is_linear:
+                with tracer.span('drivers'):
+                    drivers_section(engine, result['data'])
+            with tracer.span('uncertainty'):
+                uncertainty_section(engine, result['data'])
+
+        # Download Report Button: the PDF is rendered on the shared worker pool and
+        # cached, so this only waits if the render has not finished yet.
+        renderer = heart_core.get_report_renderer()
+        renderer.submit(result, lang)
         st.download_button(
             label=lang['download_report'],
-            data=report_text,
-            file_name="heart_report.txt",
-            mime="text/plain",
-            use_container_width=True
+            data=lambda: io.BytesIO(renderer.get(result, lang)),
+            file_name="heart_report.pdf",
+            mime="application/pdf",
+            width='stretch'
         )
-    add_footer()
+
+def live_preview(user_data, predict_risk):
+    """Renders the risk and confidence for the current form values, updated in place as they change."""
+    lang = LANGUAGES[st.session_state.language]
+    cached = st.session_state.live_preview_result
+    if cached is None or cached[0] != user_data:
+        # Trailing debounce: wait for the user to settle; changes made meanwhile are
+        # folded into a single follow-up fragment run instead of one run each.
+        time.sleep(PREVIEW_DEBOUNCE)
+        with get_tracer().span('preview'):
+            is_high_risk, confidence = predict_risk(user_data)
+        cached = st.session_state.live_preview_result = (user_data, is_high_risk, confidence)
+    _, is_high_risk, confidence = cached
+    risk_col, confidence_col = st.columns(2)
+    risk_col.metric(lang['live_preview_risk'], lang['high_risk'] if is_high_risk else lang['low_risk'])
+    confidence_col.metric(lang['confidence'], f"{confidence * 100:.2f}%")
+
+def sensitivity_section(engine, data):
+    """Renders risk curves for each continuous input, swept across its form range."""
+    import heart_core
+    import plotly.graph_objects as go
+
+    lang = LANGUAGES[st.session_state.language]
+    primary = THEMES[st.session_state.theme_mode]['primary']
+    # Figures are only built and sent while the panel is open.
+    panel = st.expander(lang['sensitivity_title'], expanded=False, key='sensitivity_panel', on_change="rerun")
+    if not panel.open:
+        return
+    with panel:
+        st.markdown(lang['sensitivity_desc'])
+        curves = heart_core.sensitivity_curves(engine, data)
+        current_risk = float(engine.risk(heart_core.encode_record(data))[0])
+        tabs = st.tabs([lang[feature] for feature in curves])
+        for tab, (feature, (values, risk)) in zip(tabs, curves.items()):
+            current = data[feature]
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=values, y=risk, mode='lines', line_color=primary, name=lang['sensitivity_risk']))
+            fig.add_trace(go.Scatter(x=[current], y=[current_risk], mode='markers', marker=dict(size=10, color='#D1D5DB'),
+                                     name=lang['sensitivity_current']))
+            fig.add_hline(y=0.5, line_dash='dot', line_color='gray')
+            fig.update_layout(showlegend=False, margin=dict(t=10, b=0, l=0, r=0), height=300,
+                              xaxis_title=lang[feature], yaxis_title=lang['sensitivity_risk'], yaxis_range=[0, 1])
+            with tab:
+                st.plotly_chart(fig, width='stretch')
+
+def drivers_section(engine, data):
+    """Renders the inputs that contributed most to one prediction."""
+    import heart_core
+    import plotly.graph_objects as go
+
+    lang = LANGUAGES[st.session_state.language]
+    panel = st.expander(lang['drivers_title'], expanded=False, key='drivers_panel', on_change="rerun")
+    if not panel.open:
+        return
+    with panel:
+        st.markdown(lang['drivers_desc'])
+        drivers = heart_core.top_drivers(engine, data)[::-1]
+        fig = go.Figure(go.Bar(
+            x=[value for _, value in drivers],
+            y=[lang[feature] for feature, _ in drivers],
+            orientation='h',
+            marker_color=[THEMES[st.session_state.theme_mode]['primary'] if value > 0 else '#34D399' for _, value in drivers]
+        ))
+        fig.update_layout(margin=dict(t=10, b=0, l=0, r=0), height=300, xaxis_title=lang['drivers_contribution'])
+        st.plotly_chart(fig, width='stretch')
+
+def uncertainty_section(engine, data):
+    """Renders how far the risk could move if the noisy measurements were taken again."""
+    import heart_core
+
+    lang = LANGUAGES[st.session_state.language]
+    # The samples are only drawn and scored while the panel is open.
+    panel = st.expander(lang['uncertainty_title'], expanded=False, key='uncertainty_panel', on_change="rerun")
+    if not panel.open:
+        return
+    with panel:
+        st.markdown(lang['uncertainty_desc'])
+        samples = st.select_slider(lang['uncertainty_samples'], options=UNCERTAINTY_SAMPLES, value=20000,
+                                   key='uncertainty_samples', format_func=lambda n: f"{n:,}")
+        noise = {}
+        for column, (feature, default) in zip(st.columns(len(heart_core.MEASUREMENT_NOISE)),
+                                              heart_core.MEASUREMENT_NOISE.items()):
+            with column:
+                noise[feature] = st.number_input(lang['uncertainty_noise'].format(feature=lang[feature]), min_value=0.0,
+                                                 value=default, step=default / 4, key=f'uncertainty_noise_{feature}')
+        start = time.perf_counter()
+        band = heart_core.measurement_uncertainty(engine, data, noise=noise, samples=samples)
+        elapsed = time.perf_counter() - start
+
+        interval_col, flip_col = st.columns(2)
+        interval_col.metric(lang['uncertainty_interval'].format(level=band.level * 100),
+                            f"{band.low * 100:.1f}% – {band.high * 100:.1f}%")
+        flip_col.metric(lang['uncertainty_flip'], f"{band.flip_probability * 100:.1f}%")
+        st.caption(lang['uncertainty_caption'].format(risk=band.risk * 100, samples=band.samples, ms=elapsed * 1000))
+
+def driver_summary_table(summary):
+    """Renders an AttributionSummary as a table of features, most frequent driver first."""
+    lang = LANGUAGES[st.session_state.language]
+    st.markdown(lang['drivers_summary_desc'].format(rows=summary.rows))
+    st.table([
+        {
+            lang['drivers_feature']: lang[row['feature']],
+            lang['drivers_share']: f"{row['top_driver_share']*100:.1f}%",
+            lang['drivers_mean']: f"{row['mean_contribution']:+.3f}",
+        }
+        for row in summary.result()
+    ])
+
+def bulk_scoring_section(engine):
+    """Renders the CSV upload that scores many patients at once."""
+    import heart_core
+    import pandas as pd
+
+    lang = LANGUAGES[st.session_state.language]
+    st.markdown("---")
+    st.subheader(lang['bulk_title'])
+    st.markdown(lang['bulk_desc'])
+    uploaded = st.file_uploader(lang['bulk_upload'], type=["csv"])
+    if uploaded is None:
+        # The upload was removed: drop its scored output too.
+        clear_bulk_result()
+        return
+    if not engine:
+        return
+
+    bulk_result = st.session_state.bulk_result
+    if bulk_result and bulk_result['file_id'] != uploaded.file_id:
+        # A different file was uploaded: drop the previous output.
+        clear_bulk_result()
+        bulk_result = None
+
+    if bulk_result is None and st.button(lang['bulk_score'], width='stretch'):
+        progress = st.progress(0.0)
+        start = time.perf_counter()
+
+        def on_progress(rows):
+            rate = rows / max(time.perf_counter() - start, 1e-9)
+            progress.progress(min(uploaded.tell() / max(uploaded.size, 1), 1.0),
+                              text=lang['bulk_progress'].format(rows=rows, rate=rate))
+
+        # Results are streamed to an anonymous temporary file so only one chunk is in
+        # memory. It has no name on disk and is deleted when it is closed, which
+        # clear_bulk_result() does, or when the session is dropped and it is collected.
+        scored = tempfile.TemporaryFile(prefix="heart_bulk_", suffix=".csv")
+        summary = heart_core.AttributionSummary(engine) if engine.is_linear else None
+        sink = io.TextIOWrapper(scored, encoding="utf-8", newline="")
+        try:
+            rows = heart_core.score_csv_in_chunks(engine, uploaded, sink, on_progress=on_progress, summary=summary)
+            sink.flush()
+        except (ValueError, pd.errors.ParserError) as e:
+            sink.close()
+            st.error(lang['bulk_error'].format(error=e))
+            return
+        sink.detach()
+        progress.progress(1.0)
+        bulk_result = {
+            'file_id': uploaded.file_id,
+            'file': scored,
+            'rows': rows,
+            'seconds': time.perf_counter() - start,
+            'summary': summary,
+        }
+        st.session_state.bulk_result = bulk_result
+
+    if bulk_result:
+        seconds = bulk_result['seconds']
+        st.success(lang['bulk_done'].format(rows=bulk_result['rows'], seconds=seconds,
+                                            rate=bulk_result['rows'] / max(seconds, 1e-9)))
+
+        def scored_csv(scored=bulk_result['file']):
+            # pread leaves the shared file position alone.
+            return os.pread(scored.fileno(), os.fstat(scored.fileno()).st_size, 0)
+
+        # Deferred, so the output is only read when the button is clicked.
+        st.download_button(
+            label=lang['bulk_download'],
+            data=scored_csv,
+            file_name=f"scored_{uploaded.name}",
+            mime="text/csv",
+            width='stretch'
+        )
+        if bulk_result['summary'] is not None:
+            st.markdown(f"#### {lang['drivers_summary_title']}")
+            driver_summary_table(bulk_result['summary'])
+
+@st.cache_data(max_entries=4096, show_spinner=False)
+def report_table(key, language, _data):
+    """Builds the patient data table for one stored report.
+
+    Cached per record_key() and language: the key is derived from the record's
+    content, so it stays correct across history databases, and st.cache_data
+    hands each caller its own copy of the table.
+    """
+    import pandas as pd
+
+    lang = LANGUAGES[language]
+    report_data_list = [
+        (lang['age'], _data['age']),
+        (lang['sex'], lang['male'] if _data['sex'] == 1 else lang['female']),
+        (lang['cp'], _data['cp']),
+        (lang['trestbps'], _data['trestbps']),
+        (lang['chol'], _data['chol']),
+        (lang['fbs'], _data['fbs']),
+        (lang['restecg'], _data['restecg']),
+        (lang['thalach'], _data['thalach']),
+        (lang['exang'], _data['exang']),
+        (lang['oldpeak'], _data['oldpeak']),
+        (lang['slope'], _data['slope']),
+        (lang['ca'], _data['ca']),
+        (lang['thal'], _data['thal'])
+    ]
+    return pd.DataFrame(report_data_list, columns=["Feature", "Value"])
 
 def reports_page():
     """Renders the reports page."""
+    import heart_core
+
     lang = LANGUAGES[st.session_state.language]
     st.title(lang['reports_title'])
+    tracer = get_tracer()
     
-    if not st.session_state.prediction_history:
+    store = load_history_store()
+    with tracer.span('query'):
+        has_reports = store.count(st.session_state.username)
+    if not has_reports:
         st.markdown(f"<p>{lang['reports_empty']}</p>", unsafe_allow_html=True)
-    else:
-        st.markdown("---")
-        for i, report in enumerate(reversed(st.session_state.prediction_history)):
-            report_status = lang['high_risk'] if report['is_high_risk'] else lang['low_risk']
-            color = THEMES[st.session_state.theme_mode]['primary'] if report['is_high_risk'] else "#34D399"
-            
-            with st.expander(f"**Report {len(st.session_state.prediction_history) - i}** - {report['timestamp']} - **{report_status}**", expanded=False):
+        add_footer()
+        return
+
+    # Filters are applied in SQL, so only the matching page of records is loaded.
+    date_col, risk_col = st.columns(2)
+    with date_col:
+        dates = st.date_input(lang['reports_filter_dates'], value=(), key='reports_dates',
+                              on_change=lambda: set_reports_page(0))
+    with risk_col:
+        risk_labels = {None: lang['reports_filter_all'], True: lang['risk_high_label'], False: lang['risk_low_label']}
+        risk = st.selectbox(lang['reports_filter_risk'], options=list(risk_labels), format_func=risk_labels.get,
+                            key='reports_risk', on_change=lambda: set_reports_page(0))
+    filters = {'is_high_risk': risk}
+    if dates:
+        filters['start'] = dates[0].strftime("%Y-%m-%d")
+        if len(dates) > 1:
+            filters['end'] = (dates[1] + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+
+    with tracer.span('query'):
+        total = store.count(st.session_state.username, **filters)
+        page_count = (total + REPORTS_PAGE_SIZE - 1) // REPORTS_PAGE_SIZE
+        page_index = min(st.session_state.reports_page_index, max(page_count - 1, 0))
+        offset = page_index * REPORTS_PAGE_SIZE
+        reports = store.page(st.session_state.username, offset, REPORTS_PAGE_SIZE, **filters) if total else []
+
+    drivers = st.expander(lang['drivers_summary_title'], expanded=False, key='reports_drivers', on_change="rerun")
+    if drivers.open:
+        # The model is only loaded once someone asks for the summary.
+        engine = load_scoring_engine()
+        if engine and engine.is_linear:
+            with tracer.span('drivers'):
+                summary = heart_core.AttributionSummary(engine)
+                for X in store.iter_feature_chunks(st.session_state.username, **filters):
+                    summary.update(X)
+                with drivers:
+                    driver_summary_table(summary)
+
+    # Exports are only built when a button is clicked, on Streamlit's download
+    # thread. They are written to a temporary file, but Streamlit then reads the whole
+    # file into memory to serve it, so the in-app exports are capped.
+    renderer = heart_core.get_report_renderer()
+    username = st.session_state.username
+    zip_col, csv_col, parquet_col = st.columns(3)
+    with zip_col:
+        st.download_button(
+            label=lang['export_reports'],
+            data=lambda: renderer.export_zip(store.iter_records(username, **filters), lang),
+            file_name="heart_reports.zip",
+            mime="application/zip",
+            width='stretch',
+            disabled=total > MAX_REPORT_EXPORT
+        )
+    for fmt, column in (('csv', csv_col), ('parquet', parquet_col)):
+        mime, extension = heart_core.EXPORT_FORMATS[fmt]
+        with column:
+            st.download_button(
+                label=lang[f'export_history_{fmt}'],
+                data=lambda fmt=fmt: heart_core.export_history(store, fmt, username, **filters),
+                file_name=f"heart_history{extension}",
+                mime=mime,
+                width='stretch',
+                disabled=total > MAX_HISTORY_EXPORT
+            )
+    if total > MAX_HISTORY_EXPORT:
+        st.caption(lang['export_history_limit'].format(total=total, limit=MAX_HISTORY_EXPORT))
+    elif total > MAX_REPORT_EXPORT:
+        st.caption(lang['export_reports_limit'].format(total=total, limit=MAX_REPORT_EXPORT))
+
+    st.markdown("---")
+    if not total:
+        st.markdown(f"<p>{lang['reports_no_match']}</p>", unsafe_allow_html=True)
+        add_footer()
+        return
+
+    for i, report in enumerate(reports):
+        report_status = lang['high_risk'] if report['is_high_risk'] else lang['low_risk']
+        color = THEMES[st.session_state.theme_mode]['primary'] if report['is_high_risk'] else "#34D399"
+
+        expander = st.expander(f"**Report {total - offset - i}** - {report['timestamp']} - **{report_status}**",
+                               expanded=False, key=f"report_{report['id']}", on_change="rerun")
+        # Collapsed reports send only their header; the body is built once opened.
+        if expander.open:
+            with expander:
                 st.write(f"**{lang['patient_name_label']}** {report['username']}")
                 st.write(f"**{lang['report_pred']}**: <span style='color:{color}'>{report_status}</span>", unsafe_allow_html=True)
                 st.write(f"**{lang['report_conf']}** {report['confidence']*100:.2f}%")
                 st.markdown("---")
-                st.subheader("Patient Data")
-                # Display data in a table or list format
-                report_data_list = [
-                    (lang['age'], report['data']['age']),
-                    (lang['sex'], lang['male'] if report['data']['sex'] == 1 else lang['female']),
-                    (lang['cp'], report['data']['cp']),
-                    (lang['trestbps'], report['data']['trestbps']),
-                    (lang['chol'], report['data']['chol']),
-                    (lang['fbs'], report['data']['fbs']),
-                    (lang['restecg'], report['data']['restecg']),
-                    (lang['thalach'], report['data']['thalach']),
-                    (lang['exang'], report['data']['exang']),
-                    (lang['oldpeak'], report['data']['oldpeak']),
-                    (lang['slope'], report['data']['slope']),
-                    (lang['ca'], report['data']['ca']),
-                    (lang['thal'], report['data']['thal'])
-                ]
-                st.table(pd.DataFrame(report_data_list, columns=["Feature", "Value"]))
+                st.subheader(lang['report_patient_data'])
+                with tracer.span('tables'):
+                    st.table(report_table(heart_core.record_key(report), st.session_state.language, report['data']))
+                st.download_button(
+                    label=lang['download_report'],
+                    data=lambda report=report: io.BytesIO(renderer.get(report, lang)),
+                    file_name="heart_report.pdf",
+                    mime="application/pdf",
+                    key=f"report_pdf_{report['id']}"
+                )
+
+    if page_count > 1:
+        prev_col, info_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button(lang['reports_prev'], disabled=page_index == 0, width='stretch',
+                      on_click=lambda: set_reports_page(page_index - 1))
+        with info_col:
+            st.markdown(f"<p style='text-align: center;'>{lang['reports_page_info'].format(page=page_index + 1, pages=page_count, total=total)}</p>", unsafe_allow_html=True)
+        with next_col:
+            st.button(lang['reports_next'], disabled=page_index >= page_count - 1, width='stretch',
+                      on_click=lambda: set_reports_page(page_index + 1))
     add_footer()
 
 def tips_page():
@@ -718,6 +804,11 @@ def settings_page():
         st.info(lang['lang_info'].format(lang=new_language))
         st.rerun()
 
+    # Confidence chart settings
+    gauge_labels = {'svg': lang['gauge_svg'], 'plotly': lang['gauge_plotly']}
+    st.session_state.gauge_mode = st.selectbox(lang['gauge_mode'], options=GAUGE_MODES, format_func=gauge_labels.get,
+                                               index=GAUGE_MODES.index(st.session_state.gauge_mode))
+
     st.subheader(lang['font_settings'])
     st.session_state.font_size = st.slider(lang['font_size'], min_value=12, max_value=20, value=st.session_state.font_size)
     st.markdown("---")
@@ -728,77 +819,148 @@ def settings_page():
     if st.button(lang['reset_app']):
         st.warning(lang['reset_info'])
         st.button("Confirm Reset", on_click=reset_app)
+
+    if is_admin():
+        diagnostics_section()
+    elif st.session_state.logged_in and os.environ.get('HEART_ADMIN_TOKEN'):
+        admin_login_section()
     add_footer()
 
-# --- Main App Logic ---
-# Apply dynamic theme and font size based on session state
-current_theme = THEMES[st.session_state.theme_mode]
-st.markdown(
-    f"""
-    <style>
-    .stApp {{
-        background-color: {current_theme['background']};
-        color: {current_theme['text_color']};
-        font-size: {st.session_state.font_size}px;
-    }}
-    .stRadio, .stSelectbox, .stNumberInput, .st-bh, .st-bl, .st-bm, .st-bn, .st-cg, .st-b, .st-e, .st-cs {{
-        color: {current_theme['text_color']} !important;
-    }}
-    .st-bv {{
-        color: {current_theme['text_color']} !important;
-        background-color: {current_theme['secondary_bg']};
-    }}
-    .report-table th, .report-table td {{
-        background-color: {current_theme['secondary_bg']};
-        color: {current_theme['text_color']};
-    }}
-    </style>
-    """,
-    unsafe_allow_html=True
-)
-
-
-st.sidebar.markdown(f"<h1 style='color: {current_theme['primary']}'>{LANGUAGES[st.session_state.language]['navigation']}</h1>", unsafe_allow_html=True)
-# Sidebar navigation buttons (always visible)
-if st.session_state.logged_in:
-    st.sidebar.markdown(f"<h3 style='color: {current_theme['primary']}'>{LANGUAGES[st.session_state.language]['dashboard_welcome'].format(username=st.session_state.username)}</h3>", unsafe_allow_html=True)
-    st.sidebar.button(LANGUAGES[st.session_state.language]['dashboard'], use_container_width=True, on_click=lambda: set_page('dashboard'))
-    st.sidebar.button(LANGUAGES[st.session_state.language]['predict'], use_container_width=True, on_click=lambda: set_page('predict'))
-    st.sidebar.button(LANGUAGES[st.session_state.language]['reports'], use_container_width=True, on_click=lambda: set_page('reports'))
-    st.sidebar.button(LANGUAGES[st.session_state.language]['tips'], use_container_width=True, on_click=lambda: set_page('tips'))
-    st.sidebar.button(LANGUAGES[st.session_state.language]['settings'], use_container_width=True, on_click=lambda: set_page('settings'))
-    st.sidebar.markdown("---")
-    if st.sidebar.button(LANGUAGES[st.session_state.language]['logout'], use_container_width=True):
-        if st.session_state.clear_history_on_logout:
-            st.session_state.prediction_history = []
-        st.session_state.logged_in = False
-        st.session_state.username = ''
-        set_page('welcome')
-else:
-    # Buttons for unauthenticated users
-    st.sidebar.button(LANGUAGES[st.session_state.language]['get_started'], use_container_width=True, on_click=lambda: set_page('login'))
-    st.sidebar.markdown(f"<p>{LANGUAGES[st.session_state.language]['login_prompt']}</p>", unsafe_allow_html=True)
-    st.sidebar.button(LANGUAGES[st.session_state.language]['tips'], use_container_width=True, on_click=lambda: set_page('tips'))
-    st.sidebar.button(LANGUAGES[st.session_state.language]['settings'], use_container_width=True, on_click=lambda: set_page('settings'))
-
-# Conditional page rendering based on session state
-if st.session_state.logged_in:
-    if st.session_state.page == 'dashboard':
-        dashboard_page()
-    elif st.session_state.page == 'predict':
-        prediction_page()
-    elif st.session_state.page == 'reports':
-        reports_page()
-    elif st.session_state.page == 'tips':
-        tips_page()
-    elif st.session_state.page == 'settings':
-        settings_page()
-else:
-    if st.session_state.page == 'login':
-        login_page()
-    elif st.session_state.page == 'tips':
-        tips_page()
-    elif st.session_state.page == 'settings':
-        settings_page()
+def is_admin():
+    """Returns whether this session has unlocked the diagnostics with $HEART_ADMIN_TOKEN."""
+    return st.session_state.logged_in and st.session_state.is_admin
+
+def check_admin_token():
+    """Unlocks administrator access for this session if the entered token matches $HEART_ADMIN_TOKEN."""
+    token = os.environ.get('HEART_ADMIN_TOKEN', '')
+    entered = st.session_state.admin_token
+    st.session_state.is_admin = bool(token) and hmac.compare_digest(entered.encode(), token.encode())
+
+def admin_login_section():
+    """Renders the token prompt that unlocks the diagnostics section."""
+    lang = LANGUAGES[st.session_state.language]
+    # The login form accepts any name, so administrator access needs a secret set on the server.
+    with st.expander(lang['admin_title']):
+        st.text_input(lang['admin_token'], type="password", key='admin_token', on_change=check_admin_token)
+        if st.session_state.admin_token:
+            st.error(lang['admin_token_error'])
+
+def diagnostics_section():
+    """Renders per-page rerun timings and model and batcher counters for administrators."""
+    import heart_core
+    import pandas as pd
+
+    lang = LANGUAGES[st.session_state.language]
+    tracer = get_tracer()
+    st.markdown("---")
+    st.subheader(lang['diagnostics_title'])
+    tracer.enabled = st.toggle(lang['diagnostics_enable'], value=tracer.enabled)
+
+    summary = tracer.summary()
+    if summary:
+        rows = [
+            [page, phase, stats['count']] + [
+                None if stats[key] is None else stats[key] * 1000 for key in ('mean', 'p50', 'p95', 'p99')
+            ]
+            for (page, phase), stats in summary.items()
+        ]
+        st.dataframe(pd.DataFrame(rows, columns=["Page", "Phase", "Count", "Mean (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)"]),
+                     hide_index=True, width='stretch')
+        st.download_button(lang['diagnostics_export'], data=tracer.prometheus_text, file_name="heart_metrics.prom",
+                           mime="text/plain")
     else:
-        welcome_page()
+        st.info(lang['diagnostics_empty'])
+
+    # Counted even with tracing off: how often each page reran as a whole versus as a fragment.
+    runs = tracer.run_counts()
+    if runs:
+        st.markdown(f"**{lang['diagnostics_reruns']}**")
+        st.dataframe(pd.DataFrame([[page, kind, count] for (page, kind), count in runs.items()],
+                                  columns=["Page", "Kind", "Runs"]),
+                     hide_index=True, width='stretch')
+
+    model_col, batcher_col = st.columns(2)
+    with model_col:
+        st.markdown(f"**{lang['diagnostics_model']}**")
+        st.json(heart_core.get_registry().stats(), expanded=False)
+    with batcher_col:
+        st.markdown(f"**{lang['diagnostics_batcher']}**")
+        st.json(heart_core.get_inference_batcher().stats(), expanded=False)
+
+    # Resident size of this session's state, largest keys first.
+    from heart_core.metrics import deep_sizeof
+    sizes = sorted(((key, deep_sizeof(value)) for key, value in st.session_state.items()), key=lambda item: -item[1])
+    st.markdown(f"**{lang['diagnostics_session_memory'].format(kib=sum(size for _, size in sizes) / 1024)}**")
+    st.dataframe(pd.DataFrame(sizes, columns=["Key", "Bytes"]), hide_index=True, width='stretch')
+    if st.button(lang['diagnostics_reset']):
+        tracer.reset()
+
+def render_sidebar(current_theme):
+    """Renders the sidebar navigation."""
+    st.sidebar.markdown(f"<h1 style='color: {current_theme['primary']}'>{LANGUAGES[st.session_state.language]['navigation']}</h1>", unsafe_allow_html=True)
+    # Sidebar navigation buttons (always visible)
+    if st.session_state.logged_in:
+        st.sidebar.markdown(f"<h3 style='color: {current_theme['primary']}'>{LANGUAGES[st.session_state.language]['dashboard_welcome'].format(username=st.session_state.username)}</h3>", unsafe_allow_html=True)
+        st.sidebar.button(LANGUAGES[st.session_state.language]['dashboard'], width='stretch', on_click=lambda: set_page('dashboard'))
+        st.sidebar.button(LANGUAGES[st.session_state.language]['predict'], width='stretch', on_click=lambda: set_page('predict'))
+        st.sidebar.button(LANGUAGES[st.session_state.language]['reports'], width='stretch', on_click=lambda: set_page('reports'))
+        st.sidebar.button(LANGUAGES[st.session_state.language]['tips'], width='stretch', on_click=lambda: set_page('tips'))
+        st.sidebar.button(LANGUAGES[st.session_state.language]['settings'], width='stretch', on_click=lambda: set_page('settings'))
+        st.sidebar.markdown("---")
+        if st.sidebar.button(LANGUAGES[st.session_state.language]['logout'], width='stretch'):
+            if st.session_state.clear_history_on_logout:
+                load_history_store().clear(st.session_state.username)
+            st.session_state.reports_page_index = 0
+            clear_bulk_result()
+            st.session_state.is_admin = False
+            st.session_state.logged_in = False
+            st.session_state.username = ''
+            set_page('welcome')
+    else:
+        # Buttons for unauthenticated users
+        st.sidebar.button(LANGUAGES[st.session_state.language]['get_started'], width='stretch', on_click=lambda: set_page('login'))
+        st.sidebar.markdown(f"<p>{LANGUAGES[st.session_state.language]['login_prompt']}</p>", unsafe_allow_html=True)
+        st.sidebar.button(LANGUAGES[st.session_state.language]['tips'], width='stretch', on_click=lambda: set_page('tips'))
+        st.sidebar.button(LANGUAGES[st.session_state.language]['settings'], width='stretch', on_click=lambda: set_page('settings'))
+
+def render_page():
+    """Renders the page selected in session state."""
+    if st.session_state.logged_in:
+        if st.session_state.page == 'dashboard':
+            dashboard_page()
+        elif st.session_state.page == 'predict':
+            prediction_page()
+        elif st.session_state.page == 'reports':
+            reports_page()
+        elif st.session_state.page == 'tips':
+            tips_page()
+        elif st.session_state.page == 'settings':
+            settings_page()
+    else:
+        if st.session_state.page == 'login':
+            login_page()
+        elif st.session_state.page == 'tips':
+            tips_page()
+        elif st.session_state.page == 'settings':
+            settings_page()
+        else:
+            welcome_page()
+
+# --- Main App Logic ---
+# Each phase of the rerun is timed when tracing is on; see heart_core.tracing.
+tracer = get_tracer()
+# Only whole-script runs get here; fragment reruns are counted by the fragment itself.
+tracer.count_run(st.session_state.page, 'full')
+st.session_state.full_run = True
+try:
+    with tracer.rerun(st.session_state.page):
+        # Apply dynamic theme and font size based on session state
+        with tracer.span('css'):
+            current_theme = THEMES[st.session_state.theme_mode]
+            st.markdown(stylesheet(st.session_state.theme_mode, st.session_state.font_size), unsafe_allow_html=True)
+        with tracer.span('sidebar'):
+            render_sidebar(current_theme)
+        with tracer.span('page'):
+            render_page()
+finally:
+    st.session_state.full_run = False
@@ -0,0 +1 @@
+"""Benchmarks for the heart disease risk predictor. Run modules with ``python -m benchmarks.<name>``."""
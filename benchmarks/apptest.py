@@ -0,0 +1,62 @@
+"""Helpers for timing app reruns and measuring what they send to the browser."""
+import os
+import tempfile
+import time
+
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+
+# Keep benchmark runs out of the real prediction history.
+os.environ.setdefault("HEART_HISTORY_DB", os.path.join(tempfile.mkdtemp(prefix="heart_bench_"), "history.db"))
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+SAMPLE_PATIENT = {
+    'age': 54, 'sex': 1, 'cp': 2, 'trestbps': 130, 'chol': 246, 'fbs': 0, 'restecg': 1,
+    'thalach': 150, 'exang': 0, 'oldpeak': 1.0, 'slope': 1, 'ca': 0, 'thal': 2,
+}
+
+
+class PayloadMeter:
+    """Counts the serialized bytes of every message a script run sends to the browser."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.messages = 0
+
+    def __enter__(self):
+        meter = self
+        self._original = original = ForwardMsgQueue.enqueue
+
+        def enqueue(queue, msg):
+            meter.bytes += msg.ByteSize()
+            meter.messages += 1
+            return original(queue, msg)
+
+        ForwardMsgQueue.enqueue = enqueue
+        return self
+
+    def __exit__(self, *exc_info):
+        ForwardMsgQueue.enqueue = self._original
+
+
+def app_test(page, logged_in=True, **session_state):
+    """Returns an AppTest of app.py positioned on page with the given session state."""
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.session_state["page"] = page
+    at.session_state["logged_in"] = logged_in
+    at.session_state["username"] = "benchmark"
+    for key, value in session_state.items():
+        at.session_state[key] = value
+    return at
+
+
+def timed_run(at):
+    """Runs the script once; returns (seconds, payload bytes) and raises on app errors."""
+    with PayloadMeter() as meter:
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed, meter.bytes
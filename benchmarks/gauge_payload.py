@@ -0,0 +1,38 @@
+"""Compares rerun time and payload size of the confidence gauge modes.
+
+    python -m benchmarks.gauge_payload [--reruns 20]
+"""
+import argparse
+import statistics
+
+from benchmarks.apptest import SAMPLE_PATIENT, app_test, timed_run
+from gauge import GAUGE_MODES
+
+
+def measure(mode, reruns):
+    result = {
+        'username': "benchmark",
+        'timestamp': "2026-01-01 00:00:00",
+        'is_high_risk': True,
+        'confidence': 0.7469,
+        'data': SAMPLE_PATIENT,
+    }
+    at = app_test("predict", gauge_mode=mode, prediction_result=result)
+    timed_run(at)  # warm-up: imports, model load, caches
+    samples = [timed_run(at) for _ in range(reruns)]
+    return [seconds for seconds, _ in samples], [size for _, size in samples]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args(argv)
+    print(f"{'mode':<8} {'median ms':>10} {'p90 ms':>8} {'bytes/rerun':>12}")
+    for mode in GAUGE_MODES:
+        seconds, sizes = measure(mode, args.reruns)
+        p90 = statistics.quantiles(seconds, n=10)[-1] if len(seconds) > 1 else seconds[0]
+        print(f"{mode:<8} {statistics.median(seconds) * 1000:>10.1f} {p90 * 1000:>8.1f} {statistics.median(sizes):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Load test: many simulated sessions walking the app, spread over a process pool.
+
+    python -m benchmarks.loadtest [--sessions 32] [--workers 4] [--iterations 10]
+                                  [--seed 0] [--output loadtest.json]
+
+Each worker process is a fresh interpreter standing in for one server replica, with
+its own history database. It opens its share of the sessions as AppTest instances
+and steps them round-robin, one script run at a time, so every session stays alive
+(and resident) until the end, as on a real server. A session walks welcome -> login
+-> dashboard, then repeats predict -> predict_submit -> reports with randomized form
+inputs, so its history grows by one record per iteration.
+
+Reported per step: count and p50/p95/p99 rerun latency. Overall: reruns per second
+across all workers, and resident memory before the sessions were opened, after they
+finished, and the growth per session. Everything runs locally; no server or network
+is needed.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+QUANTILES = (50, 95, 99)
+
+
+def resident_bytes():
+    """Returns the current resident set size of this process (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def random_patient(rng):
+    """Returns form values drawn uniformly from each feature's accepted range or codes."""
+    from heart_core.schema import FEATURES
+
+    patient = {}
+    for feature in FEATURES:
+        if feature.codes is not None:
+            patient[feature.name] = rng.choice(feature.codes)
+        elif feature.dtype is int:
+            patient[feature.name] = rng.randint(int(feature.low), int(feature.high))
+        else:
+            patient[feature.name] = round(rng.uniform(feature.low, feature.high), 1)
+    return patient
+
+
+def _click(buttons, label):
+    next(button for button in buttons if button.label == label).click()
+
+
+def _fill_form(at, lang, patient):
+    widgets = {widget.label: widget for widget in [*at.number_input, *at.selectbox, *at.radio]}
+    for column, value in patient.items():
+        widgets[lang[column]].set_value(value)
+
+
+def session_flow(at, rng, iterations, lang):
+    """Drives one session; yields (step, seconds) after each script run."""
+    from benchmarks.apptest import timed_run
+
+    def step(name):
+        return name, timed_run(at)[0]
+
+    yield step('welcome')
+    _click(at.sidebar.button, lang['get_started'])
+    yield step('login')
+    at.text_input[0].input(f"user{rng.randrange(10 ** 6)}")
+    at.text_input[1].input("loadtest@example.com")
+    at.text_input[2].input("password")
+    _click(at.button, lang['proceed'])
+    yield step('dashboard')
+    for _ in range(iterations):
+        _click(at.sidebar.button, lang['predict'])
+        yield step('predict')
+        _fill_form(at, lang, random_patient(rng))
+        _click(at.button, lang['predict_button'])
+        yield step('predict_submit')
+        _click(at.sidebar.button, lang['reports'])
+        yield step('reports')
+
+
+def run_worker(worker, sessions, iterations, seed, workdir):
+    """Runs sessions interleaved in this process; returns {step: [seconds]} and memory figures."""
+    # The app opens the store named by $HEART_HISTORY_DB; one database per replica.
+    os.environ["HEART_HISTORY_DB"] = os.path.join(workdir, f"history_{worker}.db")
+    from streamlit.testing.v1 import AppTest
+
+    from benchmarks.apptest import APP_PATH
+    from catalog import LANGUAGES
+
+    lang = LANGUAGES['English']
+    # Warm-up outside the measurement: one whole walk, so every page's imports, the
+    # model and the caches are loaded before the baseline memory is taken.
+    for _ in session_flow(AppTest.from_file(APP_PATH, default_timeout=120), random.Random(-1 - worker), 1, lang):
+        pass
+
+    rss_before = resident_bytes()
+    apps = [AppTest.from_file(APP_PATH, default_timeout=120) for _ in range(sessions)]
+    flows = [session_flow(at, random.Random(seed * 100003 + worker * 1009 + i), iterations, lang)
+             for i, at in enumerate(apps)]
+    latencies = {}
+    start = time.perf_counter()
+    while flows:
+        for flow in list(flows):
+            try:
+                name, seconds = next(flow)
+            except StopIteration:
+                flows.remove(flow)
+                continue
+            latencies.setdefault(name, []).append(seconds)
+    elapsed = time.perf_counter() - start
+    return {
+        'latencies': latencies,
+        'elapsed_seconds': elapsed,
+        'rss_before_bytes': rss_before,
+        'rss_after_bytes': resident_bytes(),
+        'sessions': sessions,
+    }
+
+
+def summarize(results):
+    """Combines worker results into per-step percentiles, throughput and memory growth."""
+    steps = {}
+    for result in results:
+        for name, seconds in result['latencies'].items():
+            steps.setdefault(name, []).extend(seconds)
+    reruns = sum(len(seconds) for seconds in steps.values())
+    wall = max(result['elapsed_seconds'] for result in results)
+    growth = [
+        (result['rss_after_bytes'] - result['rss_before_bytes']) / result['sessions']
+        for result in results if result['sessions']
+    ]
+    return {
+        'steps': {
+            name: {
+                'count': len(seconds),
+                **{f'p{q}_seconds': float(np.percentile(seconds, q)) for q in QUANTILES},
+            }
+            for name, seconds in steps.items()
+        },
+        'reruns': reruns,
+        'wall_seconds': wall,
+        'reruns_per_sec': reruns / wall if wall else None,
+        'rss_before_bytes': [result['rss_before_bytes'] for result in results],
+        'rss_after_bytes': [result['rss_after_bytes'] for result in results],
+        'rss_growth_per_session_bytes': float(np.mean(growth)) if growth else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Heart risk predictor multi-session load test.")
+    parser.add_argument("--sessions", type=int, default=32, help="simulated sessions in total")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (server replicas)")
+    parser.add_argument("--iterations", type=int, default=10, help="predict/reports rounds per session")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the randomized form inputs")
+    parser.add_argument("--output", help="write results JSON here (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    workers = max(1, min(args.workers, args.sessions))
+    shares = [args.sessions // workers + (i < args.sessions % workers) for i in range(workers)]
+    # Spawned, not forked: each worker starts as cold as a new replica would.
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="heart_load_") as workdir, \
+            ProcessPoolExecutor(workers, mp_context=context) as pool:
+        futures = [pool.submit(run_worker, i, share, args.iterations, args.seed, workdir)
+                   for i, share in enumerate(shares)]
+        summary = summarize([future.result() for future in futures])
+
+    for name, stats in summary['steps'].items():
+        print(f"{name:<16} {stats['count']:>7} runs " + " ".join(
+            f"p{q} {stats[f'p{q}_seconds'] * 1000:>8.1f} ms" for q in QUANTILES), file=sys.stderr)
+    print(f"{summary['reruns']} reruns in {summary['wall_seconds']:.1f} s "
+          f"({summary['reruns_per_sec']:.1f}/s over {workers} workers); "
+          f"resident memory {summary['rss_growth_per_session_bytes'] / 1e6:.2f} MB per session", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'sessions': args.sessions,
+            'workers': workers,
+            'iterations': args.iterations,
+            'seed': args.seed,
+        },
+        'results': summary,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""Benchmark suite: model load, scoring throughput and full page reruns.
+
+    python -m benchmarks.run [--output results.json] [--baseline benchmarks/baseline.json]
+                             [--threshold 0.25] [--memory-threshold 0.5] [--only reports]
+    python -m benchmarks.run --save-baseline
+
+Each benchmark runs once untimed to warm up, is then timed repeat times with
+the garbage collector paused (as timeit does), and finally runs once more under
+tracemalloc for the peak memory allocated. Every timed sample is preceded by a
+short fixed reference workload, and the comparison uses the interquartile mean
+(the mean of the middle half) of sample / reference time: that cancels the
+host getting faster or slower between runs and ignores lucky or stalled
+samples. Absolute timings are reported alongside.
+
+--save-baseline measures every benchmark --rounds times and stores the median
+round, so one lucky round does not become the bar. A check measures each
+benchmark once; any that look slower than their threshold are re-measured
+after the full pass, up to --rounds - 1 more times, keeping their fastest
+round, so the run fails only on a slowdown (or memory growth) that persists.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import heart_core
+from benchmarks.apptest import SAMPLE_PATIENT, app_test, timed_run
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+PAGES = {
+    "welcome": False,
+    "tips": False,
+    "settings": False,
+    "dashboard": True,
+    "predict": True,
+    "reports": True,
+}
+MIN_SAMPLE_SECONDS = 0.02
+
+
+def reference():
+    """A fixed pure-Python workload; timing it beside each sample tracks the host's current speed."""
+    total = 0
+    for i in range(50000):
+        total += i * i
+    return total
+
+
+def _iqm(values):
+    ordered = sorted(values)
+    return statistics.fmean(ordered[len(ordered) // 4:len(ordered) - len(ordered) // 4])
+
+
+def measure(fn, repeat, ops=1):
+    """Times fn repeat times beside the reference workload, then once under tracemalloc for peak memory.
+
+    A warm-up call also picks how many calls make up one sample (at least
+    MIN_SAMPLE_SECONDS, as timeit's autorange does), so sub-millisecond work
+    is not lost in timer noise.
+    """
+    start = time.perf_counter()
+    fn()
+    loops = max(1, math.ceil(MIN_SAMPLE_SECONDS / max(time.perf_counter() - start, 1e-9)))
+    seconds, relative = [], []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            reference()
+            speed = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            sample = (time.perf_counter() - start) / loops
+            seconds.append(sample)
+            relative.append(sample / speed)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    median = statistics.median(seconds)
+    return {
+        'relative_iqm': _iqm(relative),
+        'iqm_seconds': _iqm(seconds),
+        'median_seconds': median,
+        'min_seconds': min(seconds),
+        'ops_per_sec': ops / median if median else None,
+        'peak_bytes': peak,
+        'repeat': repeat,
+        'loops': loops,
+    }
+
+
+# Each group yields (name, thunk) so that --only skips the work, not just the report.
+def model_benchmarks(repeat):
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def load_x100(path):
+        for _ in range(100):
+            heart_core.ModelRegistry(path).get()
+
+    def cold_load(path):
+        # A fresh interpreter, so the imports each format needs are part of the time.
+        code = f"import heart_core; heart_core.ModelRegistry({path!r}).get()"
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=repo_dir, check=True)
+
+    for suffix, path in (("", heart_core.DEFAULT_ARTIFACT_PATH), ("_pickle", heart_core.DEFAULT_PICKLE_PATH)):
+        yield f"model_load{suffix}_x100", lambda path=path: measure(lambda: load_x100(path), repeat, ops=100)
+        yield f"model_cold_load{suffix}", lambda path=path: measure(lambda: cold_load(path), repeat)
+
+
+def scoring_benchmarks(repeat):
+    engine = heart_core.get_registry().get_engine()
+    row = heart_core.encode_record(SAMPLE_PATIENT)
+    batch = np.random.default_rng(0).uniform(0, 250, (10000, len(heart_core.FEATURE_COLUMNS)))
+
+    def single_rows():
+        for _ in range(1000):
+            engine.score(row)
+
+    def predict_risk_calls():
+        for _ in range(1000):
+            heart_core.predict_risk(engine, SAMPLE_PATIENT)
+
+    yield "score_single_row_x1000", lambda: measure(single_rows, repeat, ops=1000)
+    yield "predict_risk_x1000", lambda: measure(predict_risk_calls, repeat, ops=1000)
+    yield "score_batch_10000", lambda: measure(lambda: engine.score(batch), repeat, ops=len(batch))
+    yield "uncertainty_100000", lambda: measure(
+        lambda: heart_core.measurement_uncertainty(engine, SAMPLE_PATIENT, samples=100000, seed=0), repeat, ops=100000)
+
+
+def seed_history(path, size):
+    """Fills a fresh history database with size records for the benchmark user."""
+    store = heart_core.HistoryStore(path, batch_size=1000)
+    rng = np.random.default_rng(size)
+    for i in range(size):
+        store.append({
+            'username': "benchmark",
+            'timestamp': f"2026-01-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:{i // 60 % 60:02d}",
+            'is_high_risk': bool(rng.integers(2)),
+            'confidence': float(rng.uniform(0.5, 1.0)),
+            'data': SAMPLE_PATIENT,
+        })
+    store.close()
+
+
+def page_benchmarks(repeat, history_sizes, workdir):
+    def run_page(page, logged_in, path):
+        # The app opens the store named by $HEART_HISTORY_DB.
+        os.environ["HEART_HISTORY_DB"] = path
+        at = app_test(page, logged_in=logged_in)
+        timed_run(at)  # warm-up: imports, caches, model load
+        payload = []
+
+        def rerun():
+            payload.append(timed_run(at)[1])
+
+        result = measure(rerun, repeat)
+        result['payload_bytes'] = statistics.median(payload)
+        return result
+
+    for size in history_sizes:
+        path = os.path.join(workdir, f"history_{size}.db")
+        for page, logged_in in PAGES.items():
+            def run(page=page, logged_in=logged_in, path=path, size=size):
+                if not os.path.exists(path):
+                    seed_history(path, size)
+                return run_page(page, logged_in, path)
+
+            yield f"page_{page}_history_{size}", run
+
+
+def compare(results, baseline, threshold, memory_threshold, overrides):
+    """Returns human-readable regressions of results against baseline."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = overrides.get(name, threshold)
+        slower = current['relative_iqm'] / previous['relative_iqm'] - 1
+        if slower > limit:
+            regressions.append(f"{name}: {slower:+.0%} time (limit {limit:+.0%})")
+        if previous['peak_bytes']:
+            larger = current['peak_bytes'] / previous['peak_bytes'] - 1
+            if larger > memory_threshold:
+                regressions.append(f"{name}: {larger:+.0%} peak memory (limit {memory_threshold:+.0%})")
+    return regressions
+
+
+def _override(value):
+    name, _, ratio = value.partition("=")
+    return name, float(ratio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Heart risk predictor benchmarks.")
+    parser.add_argument("--output", help="write results JSON here (default: stdout only)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown as a fraction (0.25 = 25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.5, help="allowed peak-memory growth as a fraction")
+    parser.add_argument("--limit", type=_override, action="append", default=[], metavar="NAME=FRACTION",
+                        help="per-benchmark slowdown threshold (repeatable)")
+    parser.add_argument("--history-sizes", default="0,100,10000", help="comma-separated history sizes for page reruns")
+    parser.add_argument("--repeat", type=int, default=15, help="timed repetitions per benchmark")
+    parser.add_argument("--rounds", type=lambda value: max(1, int(value)), default=3,
+                        help="rounds per benchmark for a baseline, and attempts before a check fails")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    import tempfile
+
+    baseline = None
+    if not args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['results']
+        else:
+            print(f"no baseline at {args.baseline}; run with --save-baseline", file=sys.stderr)
+    limits = dict(args.limit)
+
+    sizes = [int(size) for size in args.history_sizes.split(",") if size]
+    results = {}
+    runs = {}
+    with tempfile.TemporaryDirectory(prefix="heart_bench_") as workdir:
+        groups = [model_benchmarks(args.repeat), scoring_benchmarks(args.repeat),
+                  page_benchmarks(args.repeat, sizes, workdir)]
+        for group in groups:
+            for name, run in group:
+                if args.only and args.only not in name:
+                    continue
+                if args.save_baseline:
+                    measured = sorted((run() for _ in range(args.rounds)), key=lambda r: r['relative_iqm'])
+                    result = measured[len(measured) // 2]
+                else:
+                    result = run()
+                    runs[name] = run
+                results[name] = result
+                print(f"{name:<36} {result['iqm_seconds'] * 1000:>10.2f} ms {result['peak_bytes'] / 1e6:>9.2f} MB peak",
+                      file=sys.stderr)
+
+        # Re-measure apparent regressions after the whole pass rather than straight
+        # away, so a retry does not land in the same slow spell; keep the fastest round.
+        for _ in range(args.rounds - 1):
+            if not baseline:
+                break
+            suspects = [name for name in results
+                        if compare({name: results[name]}, baseline, args.threshold, args.memory_threshold, limits)]
+            for name in suspects:
+                retry = runs[name]()
+                print(f"{name:<36} {retry['iqm_seconds'] * 1000:>10.2f} ms (re-measured)", file=sys.stderr)
+                results[name] = min(results[name], retry, key=lambda r: r['relative_iqm'])
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text + "\n")
+        return 0
+    if baseline is None:
+        return 0
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold, limits)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Translation catalogs, theme definitions and precompiled stylesheets for app.py.
+
+Streamlit re-executes app.py on every interaction, but this module is imported
+once per server process. Each language's strings are read from locales/ the
+first time that language is used, and the theme stylesheet is built once per
+(theme, font size) pair.
+"""
+import functools
+import json
+import os
+import re
+from collections.abc import Mapping
+
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+
+# Display order in the settings page.
+LANGUAGE_NAMES = ("English", "Hindi", "Spanish")
+
+
+@functools.lru_cache(maxsize=None)
+def load_language(name):
+    """Returns the catalog for one language, reading it from disk on first use."""
+    with open(os.path.join(LOCALES_DIR, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _LazyCatalogs(Mapping):
+    """Read-only mapping of language name to catalog that loads languages on demand."""
+
+    def __getitem__(self, name):
+        if name not in LANGUAGE_NAMES:
+            raise KeyError(name)
+        return load_language(name)
+
+    def __iter__(self):
+        return iter(LANGUAGE_NAMES)
+
+    def __len__(self):
+        return len(LANGUAGE_NAMES)
+
+
+LANGUAGES = _LazyCatalogs()
+
+THEMES = {
+    "Dark": {
+        "primary": "#DC2626",
+        "background": "#121212",
+        "secondary_bg": "#1F1F1F",
+        "text_color": "#FFFFFF"
+    },
+    "Light": {
+        "primary": "#DC2626",
+        "background": "#FFFFFF",
+        "secondary_bg": "#F0F2F6",
+        "text_color": "#000000"
+    },
+    "Blue": {
+        "primary": "#3B82F6",
+        "background": "#095CAA",
+        "secondary_bg": "#324C80",
+        "text_color": "#DCE5F1"
+    },
+    "Green": {
+        "primary": "#10B981",
+        "background": "#3AC25E",
+        "secondary_bg": "#D1FAE5",
+        "text_color": "#1F2937"
+    }
+}
+
+_STYLESHEET = """
+<style>
+.stApp {{
+    background-color: {background};
+    color: {text_color};
+    font-size: {font_size}px;
+}}
+.stRadio, .stSelectbox, .stNumberInput, .st-bh, .st-bl, .st-bm, .st-bn, .st-cg, .st-b, .st-e, .st-cs {{
+    color: {text_color} !important;
+}}
+.st-bv {{
+    color: {text_color} !important;
+    background-color: {secondary_bg};
+}}
+.report-table th, .report-table td {{
+    background-color: {secondary_bg};
+    color: {text_color};
+}}
+</style>
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet(theme_mode, font_size):
+    """Returns the minified <style> block for a theme and body font size."""
+    css = _STYLESHEET.format(font_size=font_size, **THEMES[theme_mode])
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", css).strip()
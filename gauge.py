@@ -0,0 +1,61 @@
+"""Confidence gauge rendering for the prediction result.
+
+The default gauge is a small inline SVG donut, a few hundred bytes instead of a
+Plotly figure and its JSON payload. The Plotly donut is still available and is
+cached per (confidence, theme) so reruns reuse the same figure object.
+"""
+import functools
+import math
+
+from catalog import THEMES
+
+TRACK_COLOR = '#D1D5DB'
+
+# Session-state values for the "confidence chart" setting.
+GAUGE_MODES = ('svg', 'plotly')
+
+_RADIUS = 45
+_CIRCUMFERENCE = 2 * math.pi * _RADIUS
+
+
+def _quantize(confidence):
+    # One step per 0.1% keeps the caches small without a visible difference.
+    return round(float(confidence) * 1000)
+
+
+@functools.lru_cache(maxsize=4096)
+def _svg(steps, primary, label):
+    arc = _CIRCUMFERENCE * steps / 1000
+    return (
+        f'<div style="display:flex;justify-content:center">'
+        f'<svg viewBox="0 0 120 120" width="220" height="220" role="img" aria-label="{label} {steps / 10:.1f}%">'
+        f'<circle cx="60" cy="60" r="{_RADIUS}" fill="none" stroke="{TRACK_COLOR}" stroke-width="30"/>'
+        f'<circle cx="60" cy="60" r="{_RADIUS}" fill="none" stroke="{primary}" stroke-width="30" '
+        f'stroke-dasharray="{arc:.2f} {_CIRCUMFERENCE:.2f}" transform="rotate(-90 60 60)"/>'
+        f'</svg></div>'
+    )
+
+
+def confidence_gauge_svg(confidence, theme_mode, label):
+    """Returns the HTML for an SVG donut filled to confidence (0-1) in the theme colour."""
+    return _svg(_quantize(confidence), THEMES[theme_mode]['primary'], label)
+
+
+@functools.lru_cache(maxsize=1024)
+def _figure(steps, primary, label):
+    import plotly.graph_objects as go
+
+    confidence = steps / 1000
+    fig = go.Figure(data=[go.Pie(
+        labels=[label, ''],
+        values=[confidence, 1 - confidence],
+        marker_colors=[primary, TRACK_COLOR],
+        hole=0.5
+    )])
+    fig.update_layout(showlegend=False, margin=dict(t=0, b=0, l=0, r=0))
+    return fig
+
+
+def confidence_gauge_figure(confidence, theme_mode, label):
+    """Returns the cached Plotly donut for confidence (0-1) in the theme colour."""
+    return _figure(_quantize(confidence), THEMES[theme_mode]['primary'], label)
@@ -0,0 +1,70 @@
+"""Model loading, feature schema and scoring for the heart disease risk predictor.
+
+This package has no Streamlit or Plotly dependency so it can be imported by batch
+jobs and the command line (``python -m heart_core``) as well as by ``app.py``.
+
+Public names are resolved on first access, so importing a light submodule such
+as ``heart_core.tracing`` does not pull in NumPy or the model stack.
+"""
+import importlib
+
+_EXPORTS = {
+    "AttributionSummary": "heart_core.attribution",
+    "REFERENCE_PATIENT": "heart_core.attribution",
+    "attributions": "heart_core.attribution",
+    "top_drivers": "heart_core.attribution",
+    "InferenceBatcher": "heart_core.batcher",
+    "get_inference_batcher": "heart_core.batcher",
+    "DEFAULT_HISTORY_PATH": "heart_core.history",
+    "HistoryStore": "heart_core.history",
+    "get_history_store": "heart_core.history",
+    "DEFAULT_ARTIFACT_PATH": "heart_core.model",
+    "DEFAULT_PICKLE_PATH": "heart_core.model",
+    "ModelRegistry": "heart_core.model",
+    "default_model_path": "heart_core.model",
+    "EXPORT_COLUMNS": "heart_core.export",
+    "EXPORT_FORMATS": "heart_core.export",
+    "export_history": "heart_core.export",
+    "get_registry": "heart_core.model",
+    "PredictionRecord": "heart_core.records",
+    "ReportRenderer": "heart_core.reports",
+    "get_report_renderer": "heart_core.reports",
+    "record_key": "heart_core.reports",
+    "render_pdf": "heart_core.reports",
+    "ShadowScorer": "heart_core.shadow",
+    "CONTINUOUS_FEATURES": "heart_core.schema",
+    "FEATURES": "heart_core.schema",
+    "FEATURE_CODES": "heart_core.schema",
+    "FEATURE_COLUMNS": "heart_core.schema",
+    "FEATURE_RANGES": "heart_core.schema",
+    "encode_columns": "heart_core.schema",
+    "encode_record": "heart_core.schema",
+    "feature_labels": "heart_core.schema",
+    "invalid_mask": "heart_core.schema",
+    "load_label_codes": "heart_core.schema",
+    "validate_matrix": "heart_core.schema",
+    "MEASUREMENT_NOISE": "heart_core.scoring",
+    "ScoringEngine": "heart_core.scoring",
+    "UncertaintyBand": "heart_core.scoring",
+    "measurement_uncertainty": "heart_core.scoring",
+    "predict_risk": "heart_core.scoring",
+    "score_csv_in_chunks": "heart_core.scoring",
+    "sensitivity_curves": "heart_core.scoring",
+    "Tracer": "heart_core.tracing",
+    "get_tracer": "heart_core.tracing",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'heart_core' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
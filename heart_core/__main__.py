@@ -0,0 +1,5 @@
+import sys
+
+from heart_core.cli import main
+
+sys.exit(main())
@@ -0,0 +1,112 @@
+"""Running cohort aggregates over the prediction history.
+
+Each record adds one to a handful of counters: its user's row for the day (count,
+high-risk count, confidence sum) and one histogram bucket per feature and for the
+confidence, split by risk class. The history store applies these increments in the
+same transaction as the insert, so the analytics view reads a fixed number of rows
+whether the history holds a hundred predictions or ten million.
+"""
+import collections
+
+import numpy as np
+
+from heart_core.schema import FEATURES
+
+BINS = 10
+
+# Confidence is the probability of the predicted class, so it is never below 0.5.
+CONFIDENCE_RANGE = (0.5, 1.0)
+
+
+def _lower_edges(low, high):
+    return [float(edge) for edge in np.linspace(low, high, BINS + 1)[:-1]]
+
+
+# metric -> (bucket labels, spec). Categorical features get one bucket per code (spec
+# maps code to bucket); continuous ones and the confidence get BINS equal-width buckets
+# over their (low, high) range, labelled by their lower edge.
+METRICS = {}
+for _feature in FEATURES:
+    if _feature.codes is not None:
+        METRICS[_feature.name] = (list(_feature.codes), {code: i for i, code in enumerate(_feature.codes)})
+    else:
+        METRICS[_feature.name] = (_lower_edges(_feature.low, _feature.high), (_feature.low, _feature.high))
+METRICS['confidence'] = (_lower_edges(*CONFIDENCE_RANGE), CONFIDENCE_RANGE)
+
+
+def bucket(metric, value):
+    """Returns the histogram bucket index of value for metric."""
+    spec = METRICS[metric][1]
+    if isinstance(spec, dict):
+        return spec.get(value, 0)
+    low, high = spec
+    return min(BINS - 1, max(0, int((value - low) / (high - low) * BINS)))
+
+
+def increments(rows, columns):
+    """Returns (daily, histogram) counter deltas for rows of a history insert.
+
+    rows are tuples in the order of columns (username, timestamp, is_high_risk,
+    confidence, then the features). daily is keyed by (username, day) with values
+    [count, high-risk count, confidence sum]; histogram by (username, metric,
+    is_high_risk, bucket) with values [count, value sum].
+    """
+    index = {column: i for i, column in enumerate(columns)}
+    user_i, time_i, risk_i, confidence_i = (index[column] for column in ('username', 'timestamp', 'is_high_risk', 'confidence'))
+    metrics = [(metric, index[metric]) for metric in METRICS]
+    daily = collections.defaultdict(lambda: [0, 0, 0.0])
+    histogram = collections.defaultdict(lambda: [0, 0.0])
+    for row in rows:
+        username, risk = row[user_i], int(row[risk_i])
+        day = daily[username, row[time_i][:10]]
+        day[0] += 1
+        day[1] += risk
+        day[2] += row[confidence_i]
+        for metric, i in metrics:
+            value = row[i]
+            cell = histogram[username, metric, risk, bucket(metric, value)]
+            cell[0] += 1
+            cell[1] += value
+    return daily, histogram
+
+
+class CohortSummary:
+    """Aggregates for one user (or everyone), as read back from the store."""
+
+    def __init__(self, daily_rows, histogram_rows):
+        # daily_rows: (day, count, high, confidence_sum) sorted by day.
+        self.days = [row[0] for row in daily_rows]
+        self.daily_counts = np.array([row[1] for row in daily_rows], dtype=np.int64)
+        self.daily_high = np.array([row[2] for row in daily_rows], dtype=np.int64)
+        self.total = int(self.daily_counts.sum())
+        self.high = int(self.daily_high.sum())
+        self.confidence_sum = float(sum(row[3] for row in daily_rows))
+        # histogram_rows: (metric, is_high_risk, bucket, count, value_sum).
+        self._counts = {metric: np.zeros((2, len(labels)), dtype=np.int64) for metric, (labels, _) in METRICS.items()}
+        self._sums = {metric: np.zeros(2) for metric in METRICS}
+        for metric, risk, index, count, value_sum in histogram_rows:
+            if metric in self._counts:
+                self._counts[metric][risk, index] += count
+                self._sums[metric][risk] += value_sum
+
+    @property
+    def high_risk_rate(self):
+        return self.high / self.total if self.total else None
+
+    @property
+    def mean_confidence(self):
+        return self.confidence_sum / self.total if self.total else None
+
+    def daily_high_risk_rate(self):
+        """Returns (days, high-risk share per day)."""
+        return self.days, self.daily_high / np.maximum(self.daily_counts, 1)
+
+    def histogram(self, metric):
+        """Returns (bucket labels, low-risk counts, high-risk counts) for metric."""
+        counts = self._counts[metric]
+        return METRICS[metric][0], counts[0], counts[1]
+
+    def mean(self, metric, is_high_risk):
+        """Returns the mean of metric among low- or high-risk predictions, or None if there are none."""
+        count = self._counts[metric][int(is_high_risk)].sum()
+        return float(self._sums[metric][int(is_high_risk)] / count) if count else None
@@ -0,0 +1,146 @@
+"""Versioned, checksummed binary artifact for the linear model.
+
+Unpickling ``heart_model.pkl`` imports sklearn, runs arbitrary code from the file
+and only works with the sklearn version it was pickled with. A logistic regression
+is just a coefficient vector, an intercept and the class labels, so those are
+exported once (``python -m heart_core export``) into a flat file that is loaded by
+memory-mapping it, with NumPy and the standard library only.
+
+Layout (little-endian)::
+
+    magic      8 bytes   b"HEARTMDL"
+    version    uint32    FORMAT_VERSION
+    length     uint32    byte length of the JSON header
+    header     JSON      feature order, classes, array offsets, metadata
+    padding              zeros up to an 8-byte boundary
+    payload    float64   coef (one per feature, in the header's feature order), intercept
+    checksum   32 bytes  sha256 of everything above, so the header is covered too
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"HEARTMDL"
+FORMAT_VERSION = 2
+
+_PREAMBLE = struct.Struct("<8sII")
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+class LinearModel:
+    """A binary logistic regression read from an artifact.
+
+    It exposes the attributes ScoringEngine reads from a fitted LogisticRegression
+    (``coef_``, ``intercept_``, ``classes_``, ``feature_names_in_``) and a
+    ``predict_proba`` with the same output, so it can stand in for one.
+    """
+
+    def __init__(self, coef, intercept, classes, feature_names, metadata=None):
+        self.coef_ = coef.reshape(1, -1)
+        self.intercept_ = np.asarray([intercept], dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.metadata = metadata or {}
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_[0] + self.intercept_[0]
+
+    def predict_proba(self, X):
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(np.intp)]
+
+
+def export_artifact(model, path, metadata=None):
+    """Writes a fitted binary LogisticRegression to path and returns the header written.
+
+    The file is written next to path and renamed into place, so a running registry
+    never reads a partial artifact.
+    """
+    coef = np.asarray(model.coef_, dtype="<f8") if hasattr(model, "coef_") else None
+    classes = [c.item() if hasattr(c, "item") else c for c in getattr(model, "classes_", [])]
+    if coef is None or coef.ndim != 2 or coef.shape[0] != 1 or len(classes) != 2:
+        raise ValueError(f"only binary linear models can be exported, not {type(model).__name__}")
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        raise ValueError("the model has no feature names; it must be fitted on a DataFrame")
+
+    payload = np.concatenate([coef[0], np.asarray(model.intercept_, dtype="<f8")[:1]]).astype("<f8").tobytes()
+    header = {
+        "model": "logistic_regression",
+        "features": [str(name) for name in names],
+        "classes": classes,
+        "dtype": "<f8",
+        "coef": [0, coef.shape[1]],
+        "intercept": coef.shape[1],
+        "metadata": metadata or {},
+    }
+    encoded = json.dumps(header, sort_keys=True).encode("utf-8")
+    padding = -(_PREAMBLE.size + len(encoded)) % 8
+    body = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded)) + encoded + b"\0" * padding + payload
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+        f.write(hashlib.sha256(body).digest())
+    os.replace(tmp, path)
+    return header
+
+
+def _parse_header(buffer, path):
+    """Returns (header, end of header) from the start of an artifact, checking magic and version."""
+    if len(buffer) < _PREAMBLE.size:
+        raise ValueError(f"{path}: truncated model artifact")
+    magic, version, length = _PREAMBLE.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a model artifact")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported artifact version {version} (expected {FORMAT_VERSION})")
+    end = _PREAMBLE.size + length
+    if len(buffer) < end:
+        raise ValueError(f"{path}: truncated model artifact")
+    return json.loads(bytes(buffer[_PREAMBLE.size:end])), end
+
+
+def read_header(path):
+    """Returns the JSON header of the artifact at path without reading its payload.
+
+    The checksum is not verified here; load_artifact() does that.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        length = _PREAMBLE.unpack(preamble)[2] if len(preamble) == _PREAMBLE.size else 0
+        return _parse_header(preamble + f.read(length), path)[0]
+
+
+def load_artifact(path):
+    """Memory-maps the artifact at path and returns a LinearModel.
+
+    Raises ValueError if the file is not an artifact, has an unsupported version or
+    fails its checksum.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header, offset = _parse_header(mapped, path)
+    offset += -offset % 8
+    count = header["coef"][1] + 1
+    end = offset + count * 8
+    if len(mapped) != end + _DIGEST_SIZE:
+        raise ValueError(f"{path}: artifact payload has the wrong size")
+    if hashlib.sha256(mapped[:end]).digest() != mapped[end:]:
+        raise ValueError(f"{path}: artifact checksum mismatch")
+
+    values = np.frombuffer(mapped, dtype=header["dtype"], count=count, offset=offset)
+    return LinearModel(
+        values[header["coef"][0]:header["coef"][1]],
+        float(values[header["intercept"]]),
+        header["classes"],
+        header["features"],
+        metadata=header["metadata"],
+    )
@@ -0,0 +1,77 @@
+"""Per-feature risk attribution for linear models.
+
+For a logistic regression the log-odds are a sum of per-feature terms, so the
+contribution of feature j relative to a reference patient is exactly
+``coef_j * (x_j - reference_j)``; the contributions add up to the difference in
+log-odds between the patient and the reference.
+"""
+import numpy as np
+
+from heart_core.schema import FEATURE_COLUMNS, encode_record
+
+# The prediction form's default inputs, used as the point contributions are measured from.
+REFERENCE_PATIENT = {
+    'age': 30, 'sex': 1, 'cp': 0, 'trestbps': 120, 'chol': 200, 'fbs': 0, 'restecg': 0,
+    'thalach': 150, 'exang': 0, 'oldpeak': 1.0, 'slope': 0, 'ca': 0, 'thal': 0,
+}
+
+
+def _signed_coef(engine):
+    if not engine.is_linear:
+        raise ValueError("attribution is only available for linear models")
+    # Engine coefficients push toward classes[1]; flip them if that is not the high-risk class.
+    return engine.coef if engine.classes[1] == 1 else -engine.coef
+
+
+def attributions(engine, X, reference=None):
+    """Returns the log-odds contribution of each feature for rows of X, shape (n, 13)."""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[np.newaxis, :]
+    base = encode_record(reference or REFERENCE_PATIENT)
+    return (X - base) * _signed_coef(engine)
+
+
+def top_drivers(engine, data, count=5, reference=None):
+    """Returns the count largest contributions for one patient as (feature, log-odds) pairs."""
+    contributions = attributions(engine, encode_record(data), reference)[0]
+    order = np.argsort(-np.abs(contributions))[:count]
+    return [(FEATURE_COLUMNS[j], float(contributions[j])) for j in order]
+
+
+class AttributionSummary:
+    """Running cohort summary of risk drivers, updated one feature matrix at a time.
+
+    Each update is a single matrix product over the chunk, so the summary can be
+    built over an entire history or uploaded cohort without a per-record loop.
+    """
+
+    def __init__(self, engine, reference=None):
+        self.coef = _signed_coef(engine)
+        self.base = encode_record(reference or REFERENCE_PATIENT)
+        self.rows = 0
+        self.sums = np.zeros(len(FEATURE_COLUMNS))
+        # How often each feature was a record's largest risk-increasing contribution.
+        self.top_counts = np.zeros(len(FEATURE_COLUMNS), dtype=np.int64)
+
+    def update(self, X):
+        """Adds the rows of a feature matrix to the summary."""
+        X = np.asarray(X, dtype=np.float64)
+        if not len(X):
+            return
+        contributions = (X - self.base) * self.coef
+        self.rows += len(X)
+        self.sums += contributions.sum(axis=0)
+        best = contributions.argmax(axis=1)
+        increasing = contributions[np.arange(len(X)), best] > 0
+        self.top_counts += np.bincount(best[increasing], minlength=len(FEATURE_COLUMNS))
+
+    def result(self):
+        """Returns one dict per feature, most frequent top driver first."""
+        means = self.sums / max(self.rows, 1)
+        rows = [
+            {'feature': feature, 'top_driver_count': int(self.top_counts[j]),
+             'top_driver_share': float(self.top_counts[j] / max(self.rows, 1)), 'mean_contribution': float(means[j])}
+            for j, feature in enumerate(FEATURE_COLUMNS)
+        ]
+        return sorted(rows, key=lambda row: (-row['top_driver_count'], -row['mean_contribution']))
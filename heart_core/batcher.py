@@ -0,0 +1,105 @@
+"""In-process inference queue shared by every Streamlit session.
+
+Each session thread that calls ``predict_risk`` hands its row to one worker
+thread, which waits a few milliseconds for other sessions' rows and scores them
+together as one matrix. Under a burst of clicks this replaces many tiny scoring
+calls contending for the GIL with a few batched ones.
+
+When shadow models are configured (see heart_core.shadow), each batch is handed
+to them only after the primary results have been delivered.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from heart_core.metrics import Histogram
+from heart_core.model import get_registry
+from heart_core.schema import encode_record
+from heart_core.shadow import shadow_scorer_from_env
+
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class InferenceBatcher:
+    """Gathers single-row requests from many threads and scores them in batches."""
+
+    def __init__(self, registry=None, max_batch=32, max_wait=0.003, shadows=None):
+        # None scores with get_registry() for each batch, so it follows default_model_path().
+        self.registry = registry
+        self.shadows = shadows
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_sizes = Histogram(SIZE_BUCKETS)
+        self.queue_depths = Histogram((0,) + SIZE_BUCKETS)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="heart-inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """Queues one feature vector; returns a Future of (label, confidence)."""
+        future = Future()
+        self._queue.put((np.asarray(features, dtype=np.float64), future))
+        return future
+
+    def predict_risk(self, data, timeout=10.0):
+        """Returns (is_high_risk, confidence) for one patient, scored in a shared batch."""
+        label, confidence = self.submit(encode_record(data)).result(timeout)
+        return bool(label == 1), float(confidence)
+
+    def stats(self):
+        """Returns the queue depth, the batch-size and queue-depth histograms and any shadow stats."""
+        stats = {
+            'queue_depth': self._queue.qsize(),
+            'batches': self.batch_sizes.count,
+            'rows': int(self.batch_sizes.total),
+            'batch_sizes': self.batch_sizes.buckets(),
+            'queue_depths': self.queue_depths.buckets(),
+        }
+        if self.shadows is not None:
+            stats['shadows'] = self.shadows.stats()
+        return stats
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # Depth seen when a batch opens: how far the worker is behind.
+            self.queue_depths.observe(self._queue.qsize())
+            deadline = time.monotonic() + self.max_wait
+            while len(items) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self.batch_sizes.observe(len(items))
+            X = np.stack([x for x, _ in items])
+            try:
+                labels, confidences = (self.registry or get_registry()).get_engine().score(X)
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            for (_, future), label, confidence in zip(items, labels, confidences):
+                future.set_result((label, confidence))
+            if self.shadows is not None:
+                self.shadows.observe(X, labels, confidences)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_inference_batcher():
+    """Returns the batcher for the default model, shared by every session in this process."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = InferenceBatcher(shadows=shadow_scorer_from_env())
+    return _batcher
@@ -0,0 +1,258 @@
+"""Command line: ``python -m heart_core score`` and ``python -m heart_core importtime``.
+
+``score`` reads JSON lines or CSV from files or stdin, scores rows in chunks and
+writes the input rows with ``is_high_risk`` and ``confidence`` added to stdout. Only
+NumPy and the standard library are imported up front, so the command starts quickly.
+``serve`` runs the local JSON scoring endpoint (see heart_core.server).
+``export`` converts the pickled model into the artifact format (see heart_core.artifact).
+``history`` streams the prediction history out as CSV or Parquet (see heart_core.export).
+``importtime`` reports the import cost of app pages and modules against a budget.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+from heart_core.importtime import PAGES, format_report, measure_module, measure_page, total_ms
+from heart_core.artifact import export_artifact, load_artifact
+from heart_core.model import DEFAULT_ARTIFACT_PATH, DEFAULT_PICKLE_PATH, get_registry
+from heart_core.schema import FEATURE_COLUMNS, encode_columns, load_label_codes
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _feature_matrix(rows, first_row=0):
+    try:
+        columns = {column: [row[column] for row in rows] for column in FEATURE_COLUMNS}
+    except KeyError as e:
+        raise ValueError(f"missing column: {e.args[0]}") from None
+    return encode_columns(columns, labels=load_label_codes(), first_row=first_row)
+
+
+def _detect_format(path, requested):
+    if requested:
+        return requested
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    return "jsonl"
+
+
+def _jsonl_records(lines):
+    """Yields the object on each non-blank line; raises ValueError naming the line otherwise."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {number}: invalid JSON ({e})") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"line {number}: expected a JSON object, got {type(record).__name__}")
+        yield record
+
+
+def score_jsonl(engine, lines, out, chunk_size):
+    """Scores JSON lines, writing one JSON object per input object. Returns the row count."""
+    rows = 0
+    records = _jsonl_records(lines)
+    for chunk in _chunks(records, chunk_size):
+        labels, confidences = engine.score(_feature_matrix(chunk, rows))
+        for record, label, confidence in zip(chunk, labels, confidences):
+            record["is_high_risk"] = bool(label == 1)
+            record["confidence"] = float(confidence)
+            out.write(json.dumps(record) + "\n")
+        rows += len(chunk)
+    return rows
+
+
+def score_csv(engine, lines, out, chunk_size, write_header=True):
+    """Scores CSV rows, writing them back with the result columns appended. Returns the row count."""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        return 0
+    missing = [column for column in FEATURE_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    writer = csv.writer(out)
+    if write_header:
+        writer.writerow(reader.fieldnames + ["is_high_risk", "confidence"])
+    rows = 0
+    for chunk in _chunks(reader, chunk_size):
+        labels, confidences = engine.score(_feature_matrix(chunk, rows))
+        for record, label, confidence in zip(chunk, labels, confidences):
+            writer.writerow([record[name] for name in reader.fieldnames] + [bool(label == 1), repr(float(confidence))])
+        rows += len(chunk)
+    return rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m heart_core", description="Heart disease risk scoring.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="score JSON lines or CSV rows")
+    score.add_argument("inputs", nargs="*", default=["-"], help="input files ('-' or none for stdin)")
+    score.add_argument("--format", choices=["jsonl", "csv"], help="input format (default: from the file extension, jsonl for stdin)")
+    score.add_argument("--model", help="model to score with (default: heart_model.bin if it is current, else heart_model.pkl)")
+    score.add_argument("--chunk-size", type=int, default=5000, help="rows scored per matrix operation")
+
+    importtime = commands.add_parser("importtime", help="report import cost of app pages and modules")
+    importtime.add_argument("--page", action="append", choices=sorted(PAGES), help="app page to measure (repeatable; default: all)")
+    importtime.add_argument("--module", action="append", default=[], help="module to measure (repeatable)")
+    importtime.add_argument("--budget-ms", type=float, help="fail if any page or module exceeds this many milliseconds")
+    importtime.add_argument("--top", type=int, default=10, help="slowest imports to list per target")
+
+    serve = commands.add_parser("serve", help="run the local JSON scoring endpoint")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--model", help="model to score with (default: heart_model.bin if it is current, else heart_model.pkl)")
+    serve.add_argument("--max-batch", type=int, default=64, help="most rows scored in one micro-batch")
+    serve.add_argument("--max-wait-ms", type=float, default=2.0, help="longest wait for a micro-batch to fill")
+
+    export = commands.add_parser("export", help="convert a pickled model into a memory-mappable artifact")
+    export.add_argument("--model", default=DEFAULT_PICKLE_PATH, help="pickled model to convert (needs sklearn)")
+    export.add_argument("--output", default=DEFAULT_ARTIFACT_PATH, help="artifact to write")
+    export.add_argument("--check-rows", type=int, default=10000,
+                        help="random rows scored with both models to check the export (0 to skip)")
+
+    history = commands.add_parser("history", help="export the prediction history as CSV or Parquet")
+    history.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    history.add_argument("--output", default="-", help="file to write ('-' for stdout)")
+    history.add_argument("--db", help="history database (default: $HEART_HISTORY_DB or prediction_history.db)")
+    history.add_argument("--user", help="only this user's records")
+    history.add_argument("--start", help="first timestamp to include, e.g. 2026-01-01")
+    history.add_argument("--end", help="timestamp to stop before")
+    history.add_argument("--chunk-size", type=int, default=10000, help="rows read and written per chunk")
+    return parser
+
+
+def run_history(args, out):
+    from heart_core.export import EXPORT_COLUMNS, write_csv, write_parquet
+    from heart_core.history import get_history_store
+
+    write = write_csv if args.format == "csv" else write_parquet
+    store = get_history_store(args.db)
+    chunks = store.iter_rows(args.user, EXPORT_COLUMNS, args.chunk_size, start=args.start, end=args.end)
+    if args.output == "-":
+        return write(chunks, out.buffer)
+    with open(args.output, "wb") as sink:
+        return write(chunks, sink)
+
+
+def run_export(args, out):
+    import hashlib
+    import pickle
+    import warnings
+
+    import sklearn
+
+    from heart_core.schema import FEATURE_RANGES
+
+    with open(args.model, "rb") as f:
+        payload = f.read()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        model = pickle.loads(payload)
+    # The version the model was pickled with is only reported through the mismatch warning.
+    pickled_with = next((getattr(w.message, "original_sklearn_version", None) for w in caught
+                         if hasattr(w.message, "original_sklearn_version")), sklearn.__version__)
+    header = export_artifact(model, args.output, metadata={
+        "sklearn_version": pickled_with,
+        "source_sha256": hashlib.sha256(payload).hexdigest(),
+    })
+
+    if args.check_rows:
+        import pandas as pd
+
+        rng = np.random.default_rng(0)
+        lows, highs = zip(*(FEATURE_RANGES[column] for column in header["features"]))
+        frame = pd.DataFrame(rng.uniform(lows, highs, (args.check_rows, len(lows))), columns=header["features"])
+        expected = model.predict_proba(frame)
+        actual = load_artifact(args.output).predict_proba(frame.to_numpy())
+        error = float(np.abs(expected - actual).max())
+        if error > 1e-9:
+            raise ValueError(f"exported artifact disagrees with {args.model} by up to {error:.3g}")
+        out.write(f"checked {args.check_rows} rows: max probability difference {error:.3g}\n")
+    out.write(f"wrote {args.output} (sklearn {header['metadata']['sklearn_version']}, "
+              f"{len(header['features'])} features)\n")
+
+
+def run_serve(args):
+    import asyncio
+
+    from heart_core.server import ScoringServer
+
+    engine = get_registry(args.model).get_engine()
+    server = ScoringServer(engine, args.host, args.port, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+    print(f"serving on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def run_importtime(args, out):
+    pages = args.page or ([] if args.module else list(PAGES))
+    targets = [(f"page {page}", measure_page, page) for page in pages]
+    targets += [(f"module {module}", measure_module, module) for module in args.module]
+    over_budget = []
+    for label, measure, target in targets:
+        records = measure(target)
+        out.write(format_report(label, records, args.top) + "\n")
+        if args.budget_ms is not None and total_ms(records) > args.budget_ms:
+            over_budget.append(label)
+    if over_budget:
+        out.write(f"over budget ({args.budget_ms:g} ms): {', '.join(over_budget)}\n")
+    return not over_budget
+
+
+def run_score(args, out):
+    engine = get_registry(args.model).get_engine()
+    total = 0
+    csv_header_written = False
+    for path in args.inputs:
+        fmt = _detect_format(path, args.format)
+        f = sys.stdin if path == "-" else open(path, newline="" if fmt == "csv" else None, encoding="utf-8")
+        try:
+            if fmt == "csv":
+                # Several CSV inputs are concatenated under a single header.
+                total += score_csv(engine, f, out, args.chunk_size, write_header=not csv_header_written)
+                csv_header_written = True
+            else:
+                total += score_jsonl(engine, f, out, args.chunk_size)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+    return total
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "score":
+            run_score(args, sys.stdout)
+        elif args.command == "serve":
+            run_serve(args)
+        elif args.command == "export":
+            run_export(args, sys.stdout)
+        elif args.command == "history":
+            rows = run_history(args, sys.stdout)
+            print(f"exported {rows} records", file=sys.stderr)
+        elif args.command == "importtime":
+            if not run_importtime(args, sys.stdout):
+                return 1
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,83 @@
+"""Streaming CSV and Parquet export of the prediction history.
+
+Rows are read from the store in chunks and written out chunk by chunk (one Parquet
+row group per chunk), so memory use is bounded by the chunk size, not the history.
+That holds end to end for ``python -m heart_core history``, which writes straight to
+its output. export_history() writes to an anonymous temporary file for the app's
+deferred download buttons; Streamlit reads that file into memory to serve it, so the
+app caps how many records it exports this way.
+"""
+import csv
+import io
+import tempfile
+
+from heart_core.schema import FEATURES, FEATURE_COLUMNS
+
+EXPORT_COLUMNS = ['id', 'timestamp', 'username', 'is_high_risk', 'confidence'] + FEATURE_COLUMNS
+
+EXPORT_FORMATS = {
+    'csv': ("text/csv", ".csv"),
+    'parquet': ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def write_csv(chunks, sink):
+    """Writes row chunks (tuples in EXPORT_COLUMNS order) as CSV to a binary sink; returns the row count."""
+    text = io.TextIOWrapper(sink, encoding="utf-8", newline="")
+    try:
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS)
+        rows = 0
+        for chunk in chunks:
+            writer.writerows((*row[:3], bool(row[3]), *row[4:]) for row in chunk)
+            rows += len(chunk)
+        return rows
+    finally:
+        text.flush()
+        text.detach()
+
+
+def parquet_schema():
+    """Returns the Arrow schema of a Parquet export."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ('id', pa.int64()),
+            ('timestamp', pa.timestamp('s')),
+            ('username', pa.string()),
+            ('is_high_risk', pa.bool_()),
+            ('confidence', pa.float64()),
+        ]
+        + [(feature.name, pa.int64() if feature.dtype is int else pa.float64()) for feature in FEATURES]
+    )
+
+
+def write_parquet(chunks, sink):
+    """Writes row chunks as Parquet to a binary sink, one row group per chunk; returns the row count."""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from None
+
+    schema = parquet_schema()
+    rows = 0
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            columns = [list(column) for column in zip(*chunk)]
+            columns[1] = pc.strptime(pa.array(columns[1], pa.string()), format="%Y-%m-%d %H:%M:%S", unit="s")
+            columns[3] = [bool(value) for value in columns[3]]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def export_history(store, fmt, username=None, chunk_size=10000, **filters):
+    """Exports matching records, oldest first, to a temporary file and returns it rewound."""
+    write = {'csv': write_csv, 'parquet': write_parquet}[fmt]
+    sink = tempfile.TemporaryFile()
+    write(store.iter_rows(username, EXPORT_COLUMNS, chunk_size, **filters), sink)
+    sink.seek(0)
+    return sink
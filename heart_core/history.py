@@ -0,0 +1,312 @@
+"""Durable prediction history on embedded SQLite.
+
+Records are buffered and written in batches; reads flush the buffer first, so a
+session always sees its own predictions. The database runs in WAL mode so the
+reports page can read while another session is writing.
+
+Records are keyed on the name given at login. That name is only an identity
+because the store also keeps an account per name (email and a scrypt hash of the
+password, see HistoryStore.authenticate): the first login with a name claims it,
+and later logins must present the same credentials. A name that had records before
+accounts existed goes to whoever logs in with it first.
+
+Cohort aggregates (see heart_core.analytics) are kept in their own tables and
+updated in the same transaction as each batch of inserts, so analytics never
+scan the predictions table.
+"""
+import atexit
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from heart_core.analytics import CohortSummary, increments
+from heart_core.records import PredictionRecord
+from heart_core.schema import FEATURE_COLUMNS
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prediction_history.db")
+
+_FEATURE_SQL_TYPES = {column: "REAL" if column == "oldpeak" else "INTEGER" for column in FEATURE_COLUMNS}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    is_high_risk INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    {", ".join(f"{column} {_FEATURE_SQL_TYPES[column]} NOT NULL" for column in FEATURE_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_username_timestamp ON predictions (username, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    username TEXT NOT NULL,
+    day TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    high INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (username, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS histograms (
+    username TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    is_high_risk INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    value_sum REAL NOT NULL,
+    PRIMARY KEY (username, metric, is_high_risk, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS accounts (
+    username TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    salt BLOB NOT NULL,
+    password_hash BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Bumped when the aggregate tables need rebuilding from the predictions table.
+_AGGREGATES_VERSION = 1
+
+_COLUMNS = ["username", "timestamp", "is_high_risk", "confidence"] + FEATURE_COLUMNS
+_INSERT = f"INSERT INTO predictions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+_SELECT = f"SELECT id, {', '.join(_COLUMNS)} FROM predictions"
+_UPSERT_DAILY = """
+INSERT INTO daily_stats (username, day, total, high, confidence_sum) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (username, day) DO UPDATE SET
+    total = total + excluded.total, high = high + excluded.high, confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+_UPSERT_HISTOGRAM = """
+INSERT INTO histograms (username, metric, is_high_risk, bucket, count, value_sum) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (username, metric, is_high_risk, bucket) DO UPDATE SET
+    count = count + excluded.count, value_sum = value_sum + excluded.value_sum
+"""
+
+
+def _password_hash(password, salt):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=2 ** 14, r=8, p=1)
+
+
+def _row_to_record(row):
+    return PredictionRecord(row[1], row[2], row[3], row[4], dict(zip(FEATURE_COLUMNS, row[5:])), id=row[0])
+
+
+def _where(username=None, start=None, end=None, is_high_risk=None):
+    clauses, params = [], []
+    if username is not None:
+        clauses.append("username = ?")
+        params.append(username)
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(end)
+    if is_high_risk is not None:
+        clauses.append("is_high_risk = ?")
+        params.append(int(is_high_risk))
+    if not clauses:
+        return "", ()
+    return " WHERE " + " AND ".join(clauses), tuple(params)
+
+
+class HistoryStore:
+    """Prediction history shared by every session of the server process."""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, batch_size=16, flush_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < _AGGREGATES_VERSION:
+            self._rebuild_aggregates()
+
+    def authenticate(self, username, email, password):
+        """Returns whether email and password match username's account, creating it on first use."""
+        email = email.strip().casefold()
+        with self._lock:
+            account = self._conn.execute(
+                "SELECT email, salt, password_hash FROM accounts WHERE username = ?", (username,)
+            ).fetchone()
+        if account is None:
+            salt = os.urandom(16)
+            digest = _password_hash(password, salt)
+            with self._lock, self._conn:
+                created = self._conn.execute(
+                    "INSERT OR IGNORE INTO accounts (username, email, salt, password_hash) VALUES (?, ?, ?, ?)",
+                    (username, email, salt, digest),
+                ).rowcount
+            # Another session may have claimed the name in between; check against its account.
+            return bool(created) or self.authenticate(username, email, password)
+        stored_email, salt, digest = account
+        return hmac.compare_digest(_password_hash(password, salt), digest) and email == stored_email
+
+    def append(self, record):
+        """Queues a prediction record (a dict or PredictionRecord); it is written with the next batch."""
+        data = record['data']
+        row = (
+            record['username'],
+            record['timestamp'],
+            int(bool(record['is_high_risk'])),
+            float(record['confidence']),
+            *(data[column] for column in FEATURE_COLUMNS),
+        )
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        """Writes any queued records in one transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._pending:
+            with self._conn:
+                self._conn.executemany(_INSERT, self._pending)
+                self._add_to_aggregates(self._pending)
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def _add_to_aggregates(self, rows):
+        daily, histogram = increments(rows, _COLUMNS)
+        self._conn.executemany(_UPSERT_DAILY, [key + tuple(values) for key, values in daily.items()])
+        self._conn.executemany(_UPSERT_HISTOGRAM, [key + tuple(values) for key, values in histogram.items()])
+
+    def _rebuild_aggregates(self):
+        # One full pass when an existing database first gains the aggregate tables.
+        with self._conn:
+            self._conn.execute("DELETE FROM daily_stats")
+            self._conn.execute("DELETE FROM histograms")
+            cursor = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM predictions")
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                self._add_to_aggregates(rows)
+            self._conn.execute(f"PRAGMA user_version = {_AGGREGATES_VERSION}")
+
+    def count(self, username=None, start=None, end=None, is_high_risk=None):
+        """Returns the number of stored records matching the filters.
+
+        start and end are timestamp strings bounding a half-open range; is_high_risk
+        restricts to one risk class. None means no filter.
+        """
+        where, params = _where(username, start, end, is_high_risk)
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(f"SELECT COUNT(*) FROM predictions{where}", params).fetchone()[0]
+
+    def page(self, username=None, offset=0, limit=20, start=None, end=None, is_high_risk=None):
+        """Returns up to limit matching records, newest first, starting offset records in."""
+        where, params = _where(username, start, end, is_high_risk)
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(
+                f"{_SELECT}{where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                params + (limit, offset),
+            ).fetchall()
+        return [_row_to_record(row) for row in rows]
+
+    def cohort(self, username=None):
+        """Returns the CohortSummary of one user's predictions, or of everyone's.
+
+        Reads only the aggregate tables: one row per day and a fixed number of
+        histogram buckets, however many predictions are stored.
+        """
+        where, params = _where(username)
+        with self._lock:
+            self._flush_locked()
+            daily = self._conn.execute(
+                f"SELECT day, SUM(total), SUM(high), SUM(confidence_sum) FROM daily_stats{where} GROUP BY day ORDER BY day",
+                params,
+            ).fetchall()
+            histogram = self._conn.execute(
+                f"SELECT metric, is_high_risk, bucket, SUM(count), SUM(value_sum) FROM histograms{where} "
+                "GROUP BY metric, is_high_risk, bucket",
+                params,
+            ).fetchall()
+        return CohortSummary(daily, histogram)
+
+    def iter_feature_chunks(self, username=None, chunk_size=10000, **filters):
+        """Yields the stored feature vectors as float64 matrices of up to chunk_size rows."""
+        where, params = _where(username, **filters)
+        sql = f"SELECT {', '.join(FEATURE_COLUMNS)} FROM predictions{where}"
+        for rows in self._scan(sql, params, chunk_size):
+            yield np.array(rows, dtype=np.float64)
+
+    def iter_records(self, username=None, chunk_size=1000, **filters):
+        """Yields every matching record, newest first, fetching chunk_size rows at a time."""
+        where, params = _where(username, **filters)
+        sql = f"{_SELECT}{where} ORDER BY timestamp DESC, id DESC"
+        for rows in self._scan(sql, params, chunk_size):
+            yield from (_row_to_record(row) for row in rows)
+
+    def iter_rows(self, username=None, columns=None, chunk_size=10000, **filters):
+        """Yields lists of up to chunk_size raw row tuples, oldest first.
+
+        columns selects and orders the fields (default: id, then the stored columns).
+        """
+        where, params = _where(username, **filters)
+        sql = f"SELECT {', '.join(columns or ['id'] + _COLUMNS)} FROM predictions{where} ORDER BY timestamp, id"
+        yield from self._scan(sql, params, chunk_size)
+
+    def _scan(self, sql, params, chunk_size):
+        # Long scans go through their own connection, so they see a consistent
+        # snapshot and do not block sessions that are writing.
+        self.flush()
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            conn.close()
+
+    def clear(self, username=None):
+        """Deletes stored records, optionally only those of one user. Accounts are kept."""
+        where, params = _where(username)
+        with self._lock:
+            self._flush_locked()
+            with self._conn:
+                for table in ("predictions", "daily_stats", "histograms"):
+                    self._conn.execute(f"DELETE FROM {table}{where}", params)
+
+    def close(self):
+        """Flushes queued records and closes the database."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_history_store(path=None):
+    """Returns the history store for path, shared by every caller in this process.
+
+    Without a path, $HEART_HISTORY_DB is used if set, else DEFAULT_HISTORY_PATH.
+    """
+    path = os.path.abspath(path or os.environ.get("HEART_HISTORY_DB", DEFAULT_HISTORY_PATH))
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = HistoryStore(path)
+                atexit.register(store.flush)
+    return store
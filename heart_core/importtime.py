@@ -0,0 +1,89 @@
+"""Import-time reports in the style of ``python -X importtime``, checked against a budget.
+
+Each measurement runs in a fresh interpreter. For app pages the script is driven
+through Streamlit's ``AppTest`` and only the imports triggered by the page run are
+counted, since Streamlit's own startup cost is fixed and outside the app's control.
+"""
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+ImportRecord = namedtuple("ImportRecord", ["name", "self_us", "cumulative_us", "depth"])
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Pages and whether they require a logged-in session.
+PAGES = {
+    "welcome": False,
+    "login": False,
+    "tips": False,
+    "settings": False,
+    "dashboard": True,
+    "predict": True,
+    "reports": True,
+}
+
+_MARKER = "heart_core.importtime: page run starts"
+
+_PAGE_SCRIPT = """
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.session_state["page"] = {page!r}
+at.session_state["logged_in"] = {logged_in!r}
+at.session_state["username"] = "importtime"
+sys.stderr.write({marker!r} + "\\n")
+at.run()
+"""
+
+
+def parse_importtime(text):
+    """Parses ``-X importtime`` stderr into ImportRecords, in import order."""
+    records = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header row
+        name = fields[2]
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append(ImportRecord(name.strip(), int(fields[0]), int(fields[1]), depth))
+    return records
+
+
+def _run(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(APP_PATH),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    return result.stderr
+
+
+def measure_module(module):
+    """Returns the ImportRecords for importing module in a fresh interpreter."""
+    return parse_importtime(_run(f"import {module}"))
+
+
+def measure_page(page):
+    """Returns the ImportRecords caused by one run of an app page in a fresh interpreter."""
+    code = _PAGE_SCRIPT.format(app=APP_PATH, page=page, logged_in=PAGES[page], marker=_MARKER)
+    stderr = _run(code)
+    return parse_importtime(stderr.split(_MARKER, 1)[1] if _MARKER in stderr else "")
+
+
+def total_ms(records):
+    """Returns the cumulative import time of the top-level imports, in milliseconds."""
+    return sum(record.cumulative_us for record in records if record.depth == 0) / 1000.0
+
+
+def format_report(label, records, top=10):
+    """Formats the slowest top-level imports for label, slowest first."""
+    lines = [f"{label}: {total_ms(records):.1f} ms in {len(records)} imports"]
+    slowest = sorted((r for r in records if r.depth == 0), key=lambda r: r.cumulative_us, reverse=True)
+    for record in slowest[:top]:
+        lines.append(f"  {record.cumulative_us / 1000.0:9.1f} ms  {record.name}")
+    return "\n".join(lines)
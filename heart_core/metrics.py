@@ -0,0 +1,105 @@
+"""Small in-process metric primitives shared by the server, batcher and diagnostics."""
+import collections
+import sys
+import threading
+import time
+import types
+
+
+class RollingStats:
+    """Keeps the most recent samples of a measurement and reports percentiles over them."""
+
+    def __init__(self, window=10000):
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.started = time.monotonic()
+
+    def add(self, value):
+        """Records one sample."""
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+
+    def percentile(self, q):
+        """Returns the q-th percentile (0-100) of the window, or None if it is empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))]
+
+    def summary(self, percentiles=(50, 95, 99)):
+        """Returns count, rate per second since start, mean and the requested percentiles."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        result = {
+            'count': self.count,
+            'rate_per_sec': self.count / elapsed,
+            'mean': self.total / self.count if self.count else None,
+        }
+        for q in percentiles:
+            result[f'p{q}'] = self.percentile(q)
+        return result
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style (each bucket counts values <= bound)."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        """Records one value."""
+        with self._lock:
+            for i, bound in enumerate(self.bounds):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            else:
+                self._counts[-1] += 1
+            self.count += 1
+            self.total += value
+
+    def buckets(self):
+        """Returns [(upper bound, cumulative count)], ending with (inf, total count)."""
+        with self._lock:
+            counts = list(self._counts)
+        result, running = [], 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_sizeof(obj, _seen=None):
+    """Returns the bytes held by obj and everything it references, counting shared objects once.
+
+    Containers, slotted objects and instance dicts are followed; classes, modules and
+    functions are not, since they are shared by the whole process.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen or isinstance(obj, _OPAQUE_TYPES):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    else:
+        for cls in type(obj).__mro__:
+            for slot in cls.__dict__.get('__slots__', ()):
+                if hasattr(obj, slot):
+                    size += deep_sizeof(getattr(obj, slot), seen)
+        if hasattr(obj, '__dict__'):
+            size += deep_sizeof(vars(obj), seen)
+    return size
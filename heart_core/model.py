@@ -0,0 +1,163 @@
+"""Process-wide, hot-reloading model registry."""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+from heart_core.artifact import MAGIC, load_artifact, read_header
+from heart_core.scoring import ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PICKLE_PATH = os.path.join(_REPO_DIR, "heart_model.pkl")
+DEFAULT_ARTIFACT_PATH = os.path.join(_REPO_DIR, "heart_model.bin")
+
+
+class ModelRegistry:
+    """Process-wide holder for the prediction model.
+
+    The artifact is loaded once and shared by every session: a file written by
+    ``python -m heart_core export`` is memory-mapped (see heart_core.artifact), and
+    a ``.pkl`` file is unpickled, which needs sklearn. Pickles run code when loaded,
+    so any other file that is not an artifact is refused. On each lookup the
+    file is stat()ed; if its mtime or size changed, the content hash is compared and
+    a new model is loaded and swapped in without restarting the server.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # (model, engine, stat signature, sha256) replaced as a single tuple so readers
+        # never observe a half-updated entry.
+        self._entry = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.last_load_seconds = 0.0
+        self.total_load_seconds = 0.0
+
+    def get(self):
+        """Returns the current model, reloading it if the file on disk changed."""
+        return self._current()[0]
+
+    def get_engine(self):
+        """Returns the ScoringEngine built for the current model."""
+        return self._current()[1]
+
+    def _current(self):
+        st_result = os.stat(self.path)
+        signature = (st_result.st_mtime_ns, st_result.st_size)
+        entry = self._entry
+        if entry is not None and entry[2] == signature:
+            with self._lock:
+                self.hits += 1
+            return entry
+
+        with self._lock:
+            entry = self._entry
+            if entry is not None and entry[2] == signature:
+                self.hits += 1
+                return entry
+
+            with open(self.path, "rb") as f:
+                payload = f.read()
+            digest = hashlib.sha256(payload).hexdigest()
+            if entry is not None and entry[3] == digest:
+                # Touched but not changed: keep the loaded model.
+                self._entry = (entry[0], entry[1], signature, digest)
+                self.hits += 1
+                return self._entry
+
+            start = time.perf_counter()
+            if payload.startswith(MAGIC):
+                model = load_artifact(self.path)
+            elif self.path.endswith(".pkl"):
+                model = pickle.loads(payload)
+            else:
+                raise ValueError(f"{self.path}: not a model artifact (only .pkl files are unpickled)")
+            engine = ScoringEngine(model)
+            elapsed = time.perf_counter() - start
+            if entry is not None:
+                self.reloads += 1
+            self.misses += 1
+            self.last_load_seconds = elapsed
+            self.total_load_seconds += elapsed
+            self._entry = (model, engine, signature, digest)
+            return self._entry
+
+    def stats(self):
+        """Returns cache counters and load timings."""
+        entry = self._entry
+        return {
+            "path": self.path,
+            "sha256": entry[3] if entry else None,
+            "model_type": type(entry[0]).__name__ if entry else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "last_load_seconds": self.last_load_seconds,
+            "total_load_seconds": self.total_load_seconds,
+        }
+
+
+def _signature(path):
+    try:
+        st_result = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st_result.st_mtime_ns, st_result.st_size)
+
+
+# ((artifact signature, pickle signature), chosen path) from the last default_model_path().
+_default_choice = (None, None)
+_default_lock = threading.Lock()
+
+
+def default_model_path(artifact_path=DEFAULT_ARTIFACT_PATH, pickle_path=DEFAULT_PICKLE_PATH):
+    """Returns the model file to serve when none is named.
+
+    The exported artifact loads without sklearn, so it is preferred, but only while
+    it was exported from the pickle as it is now: its header records the pickle's
+    sha256. If the pickle has been replaced since (the hot-reload workflow), the
+    stale artifact is skipped with a warning and the pickle is served. Checked on
+    every call, at the cost of two stat()s unless one of the files changed.
+    """
+    global _default_choice
+    key = (_signature(artifact_path), _signature(pickle_path))
+    if key[0] is None:
+        return pickle_path
+    if key[1] is None:
+        return artifact_path
+    choice = _default_choice
+    if choice[0] == key:
+        return choice[1]
+    with _default_lock:
+        try:
+            source = read_header(artifact_path)["metadata"].get("source_sha256")
+        except (OSError, ValueError):
+            source = None
+        with open(pickle_path, "rb") as f:
+            current = hashlib.file_digest(f, "sha256").hexdigest()
+        path = artifact_path if source == current else pickle_path
+        if path == pickle_path:
+            logger.warning("%s was not exported from the current %s; serving the pickle "
+                           "(re-run `python -m heart_core export`)", artifact_path, pickle_path)
+        _default_choice = (key, path)
+    return path
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(path=None):
+    """Returns the registry for path (default: default_model_path()), shared by every caller in this process."""
+    path = os.path.abspath(path or default_model_path())
+    registry = _registries.get(path)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(path, ModelRegistry(path))
+    return registry
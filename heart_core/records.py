@@ -0,0 +1,78 @@
+"""Compact in-memory representation of a prediction record.
+
+A record as a plain dict (with a nested 13-key ``data`` dict, a timestamp string
+and a NumPy confidence) takes over a kilobyte per prediction. PredictionRecord
+keeps the same fields in slots, the integer features in a fixed-width array and
+the timestamp as seconds, at roughly a third of that. It supports the item
+access the rest of the code uses (``record['data']``, ``record['timestamp']``),
+so it can be passed anywhere a record dict is expected.
+"""
+import datetime
+from array import array
+
+from heart_core.schema import FEATURE_COLUMNS
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# oldpeak is the only fractional feature; everything else is an integer code or measurement.
+_INTEGER_COLUMNS = [column for column in FEATURE_COLUMNS if column != 'oldpeak']
+_OLDPEAK_INDEX = FEATURE_COLUMNS.index('oldpeak')
+
+# Naive local time, as written by the form; no time zone is involved in the round trip.
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+_FIELDS = ('id', 'username', 'timestamp', 'is_high_risk', 'confidence', 'data')
+
+
+class PredictionRecord:
+    """One prediction: who, when, the outcome and the 13 input features."""
+
+    __slots__ = ('id', 'username', 'seconds', 'is_high_risk', 'confidence', '_codes', '_oldpeak')
+
+    def __init__(self, username, timestamp, is_high_risk, confidence, data, id=None):
+        self.id = id
+        self.username = username
+        self.seconds = int((datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT) - _EPOCH).total_seconds())
+        self.is_high_risk = bool(is_high_risk)
+        self.confidence = float(confidence)
+        self._codes = array('i', (int(data[column]) for column in _INTEGER_COLUMNS))
+        self._oldpeak = float(data['oldpeak'])
+
+    @classmethod
+    def from_dict(cls, record):
+        """Returns a compact copy of a record dict (or of another PredictionRecord)."""
+        return cls(record['username'], record['timestamp'], record['is_high_risk'], record['confidence'],
+                   record['data'], id=record.get('id'))
+
+    @property
+    def timestamp(self):
+        return (_EPOCH + datetime.timedelta(seconds=self.seconds)).strftime(TIMESTAMP_FORMAT)
+
+    @property
+    def data(self):
+        values = list(self._codes)
+        values.insert(_OLDPEAK_INDEX, self._oldpeak)
+        return dict(zip(FEATURE_COLUMNS, values))
+
+    def __getitem__(self, key):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _FIELDS else default
+
+    def to_dict(self):
+        """Returns the record as a plain dict."""
+        return {field: getattr(self, field) for field in _FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, PredictionRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"PredictionRecord(id={self.id!r}, username={self.username!r}, timestamp={self.timestamp!r}, "
+                f"is_high_risk={self.is_high_risk!r}, confidence={self.confidence!r})")
@@ -0,0 +1,242 @@
+"""PDF prediction reports rendered on a worker pool and cached by record identity.
+
+Rendering happens off the Streamlit script thread: a report is submitted when a
+prediction is made and later reruns (or the download itself) pick up the cached
+bytes. Bulk export writes a ZIP archive to a temporary file one report at a time, so
+building it needs memory for only a few reports; a Streamlit download button still
+reads the finished file into memory, which is why the app caps the ZIP export.
+
+Reports are labelled from the session's translation catalog. The built-in PDF font
+(Helvetica) only covers Latin-script text, so a language it cannot draw falls back
+to English labels, and characters it lacks (e.g. in a Hindi name) are drawn as "?".
+Set ``HEART_PDF_FONT`` to a TrueType font that covers the script (for example Noto
+Sans Devanagari for Hindi) to embed it and render those languages in full.
+"""
+import collections
+import functools
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from heart_core.schema import FEATURE_COLUMNS
+
+FEATURE_LABELS = {
+    'age': "Age",
+    'sex': "Sex",
+    'cp': "Chest Pain Type",
+    'trestbps': "Resting Blood Pressure",
+    'chol': "Cholesterol",
+    'fbs': "Fasting Blood Sugar > 120 mg/dl",
+    'restecg': "Resting ECG Results",
+    'thalach': "Maximum Heart Rate Achieved",
+    'exang': "Exercise-induced Angina",
+    'oldpeak': "ST Depression",
+    'slope': "Slope of ST Segment",
+    'ca': "Number of Major Vessels",
+    'thal': "Thalassemia",
+}
+
+
+def record_key(record):
+    """Returns a stable identity for a prediction record, equal for its stored copy."""
+    data = record['data']
+    identity = {
+        'username': record['username'],
+        'timestamp': record['timestamp'],
+        'is_high_risk': bool(record['is_high_risk']),
+        'confidence': float(record['confidence']),
+        'data': {column: data[column] for column in FEATURE_COLUMNS},
+    }
+    return hashlib.sha1(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def report_filename(record):
+    """Returns a descriptive file name for a record's PDF."""
+    stamp = record['timestamp'].replace("-", "").replace(":", "").replace(" ", "_")
+    return f"heart_report_{stamp}_{record_key(record)[:8]}.pdf"
+
+
+# Catalog keys of the fixed report text, with the English used when a catalog is
+# not given or the font cannot draw it. Feature names come from FEATURE_LABELS.
+REPORT_TEXT = {
+    'report_header': "Heart Disease Risk Prediction Report",
+    'patient_name_label': "Patient Name:",
+    'report_date': "Date:",
+    'report_pred': "Prediction:",
+    'report_conf': "Confidence:",
+    'risk_high_label': "High Risk",
+    'risk_low_label': "Low Risk",
+    'report_patient_data': "Patient Data",
+    'male': "Male",
+    'female': "Female",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def pdf_fonts():
+    """Returns (regular, bold, covers) for report text, registering $HEART_PDF_FONT once if set.
+
+    covers(text) tells whether the font has a glyph for every character of text.
+    """
+    path = os.environ.get("HEART_PDF_FONT")
+    if not path:
+        def covers(text):
+            try:
+                text.encode("cp1252")
+            except UnicodeEncodeError:
+                return False
+            return True
+        return "Helvetica", "Helvetica-Bold", covers
+
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    font = TTFont("HeartReport", path)
+    pdfmetrics.registerFont(font)
+    glyphs = font.face.charToGlyph
+    return "HeartReport", "HeartReport", lambda text: all(ord(char) in glyphs for char in text)
+
+
+def report_labels(translations=None):
+    """Returns the report's labels as a tuple of (key, text) pairs, from translations if the font can draw them.
+
+    The tuple is hashable, so it also identifies the language in the renderer's cache.
+    """
+    english = {**REPORT_TEXT, **FEATURE_LABELS}
+    if translations:
+        localized = {key: translations.get(key, text) for key, text in english.items()}
+        if all(map(pdf_fonts()[2], localized.values())):
+            return tuple(localized.items())
+    return tuple(english.items())
+
+
+def render_pdf(record, labels=None):
+    """Renders one prediction record as a single-page PDF and returns its bytes.
+
+    labels is a report_labels() tuple; the default is English.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    text = dict(labels or report_labels())
+    regular, bold, covers = pdf_fonts()
+
+    def drawable(value):
+        return "".join(char if covers(char) else "?" for char in str(value))
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4, invariant=1)
+    width, height = A4
+    y = height - 72
+    pdf.setTitle(text['report_header'])
+    pdf.setFont(bold, 18)
+    pdf.drawString(72, y, text['report_header'])
+    y -= 36
+
+    pdf.setFont(regular, 12)
+    for label, value in [
+        (text['patient_name_label'], record['username']),
+        (text['report_date'], record['timestamp']),
+        (text['report_pred'], text['risk_high_label'] if record['is_high_risk'] else text['risk_low_label']),
+        (text['report_conf'], f"{record['confidence']*100:.2f}%"),
+    ]:
+        pdf.drawString(72, y, label)
+        pdf.drawString(240, y, drawable(value))
+        y -= 18
+
+    y -= 18
+    pdf.setFont(bold, 14)
+    pdf.drawString(72, y, text['report_patient_data'])
+    y -= 22
+    pdf.setFont(regular, 11)
+    data = record['data']
+    for column in FEATURE_COLUMNS:
+        value = data[column]
+        if column == 'sex':
+            value = text['male'] if value == 1 else text['female']
+        pdf.drawString(72, y, text[column])
+        pdf.drawString(320, y, drawable(value))
+        y -= 16
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class ReportRenderer:
+    """Renders PDFs on a thread pool and keeps the most recent ones in an LRU cache."""
+
+    def __init__(self, max_workers=2, max_entries=256):
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="heart-report")
+        self._lock = threading.Lock()
+        self._futures = collections.OrderedDict()
+
+    def submit(self, record, translations=None):
+        """Starts rendering record in the language of translations if it is not cached yet; returns its Future."""
+        labels = report_labels(translations)
+        key = (record_key(record), labels)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._executor.submit(render_pdf, record, labels)
+                self._futures[key] = future
+                while len(self._futures) > self.max_entries:
+                    self._futures.popitem(last=False)
+            else:
+                self._futures.move_to_end(key)
+            return future
+
+    def get(self, record, translations=None):
+        """Returns the PDF bytes for record, waiting for the render if it is in flight."""
+        return self.submit(record, translations).result()
+
+    def write_zip(self, records, sink, translations=None, window=8):
+        """Writes one PDF per record into a ZIP archive on sink; returns the count.
+
+        At most window reports are rendering or waiting to be written at a time,
+        so memory stays bounded however many records are exported. Bulk renders
+        bypass the cache so an export does not evict recently viewed reports.
+        """
+        labels = report_labels(translations)
+        count = 0
+        pending = collections.deque()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for index, record in enumerate(records, start=1):
+                name = f"{index:05d}_{report_filename(record)}"
+                pending.append((name, self._executor.submit(render_pdf, record, labels)))
+                if len(pending) >= window:
+                    name, future = pending.popleft()
+                    archive.writestr(name, future.result())
+                    count += 1
+            while pending:
+                name, future = pending.popleft()
+                archive.writestr(name, future.result())
+                count += 1
+        return count
+
+    def export_zip(self, records, translations=None):
+        """Writes the records' reports to a temporary ZIP file and returns it rewound."""
+        sink = tempfile.TemporaryFile()
+        self.write_zip(records, sink, translations)
+        sink.seek(0)
+        return sink
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_report_renderer():
+    """Returns the report renderer shared by every session in this process."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ReportRenderer()
+    return _renderer
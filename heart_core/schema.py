@@ -0,0 +1,184 @@
+"""Feature schema shared by the form, file uploads, the command line and the scoring endpoint.
+
+FEATURES describes each of the 13 model inputs once: its type, the range the form
+accepts and, for categorical inputs, the codes and the translation key that labels
+them. Everything else (column order, ranges, label lookup tables and the arrays the
+vectorized validator compares against) is derived from it when the module loads.
+"""
+import functools
+import glob
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+DEFAULT_LOCALES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "locales")
+
+
+class Feature(NamedTuple):
+    name: str
+    dtype: type
+    low: float
+    high: float
+    # Categorical inputs: the valid codes, and where their labels live in a translation
+    # catalog. labels is either one key holding a list (one label per code, in order) or
+    # a tuple with one key per code. None means the code is shown as is.
+    codes: tuple = None
+    labels: object = None
+
+
+# Column order the model was trained on; ranges are the inclusive (min, max) the form accepts.
+FEATURES = (
+    Feature('age', int, 1, 120),
+    Feature('sex', int, 0, 1, (0, 1), ('female', 'male')),
+    Feature('cp', int, 0, 3, (0, 1, 2, 3), 'cp_options'),
+    Feature('trestbps', int, 50, 250),
+    Feature('chol', int, 100, 600),
+    Feature('fbs', int, 0, 1, (0, 1), 'fbs_options'),
+    Feature('restecg', int, 0, 2, (0, 1, 2), 'restecg_options'),
+    Feature('thalach', int, 60, 220),
+    Feature('exang', int, 0, 1, (0, 1), 'exang_options'),
+    Feature('oldpeak', float, 0.0, 6.2),
+    Feature('slope', int, 0, 2, (0, 1, 2), 'slope_options'),
+    Feature('ca', int, 0, 3, (0, 1, 2, 3)),
+    Feature('thal', int, 0, 2, (0, 1, 2), 'thal_options'),
+)
+
+FEATURE_COLUMNS = [feature.name for feature in FEATURES]
+FEATURE_RANGES = {feature.name: (feature.low, feature.high) for feature in FEATURES}
+FEATURE_CODES = {feature.name: feature.codes for feature in FEATURES if feature.codes is not None}
+
+# Measured quantities on a continuous scale; the rest are categorical codes.
+CONTINUOUS_FEATURES = ['age', 'trestbps', 'chol', 'thalach', 'oldpeak']
+
+# Row vectors the validator broadcasts against a whole (rows, 13) matrix at once.
+_LOW = np.array([feature.low for feature in FEATURES], dtype=np.float64)
+_HIGH = np.array([feature.high for feature in FEATURES], dtype=np.float64)
+_INTEGER = np.array([feature.dtype is int for feature in FEATURES])
+# Categorical columns whose codes are not simply every integer in [low, high].
+_SPARSE_CODES = [
+    (i, np.array(feature.codes, dtype=np.float64)) for i, feature in enumerate(FEATURES)
+    if feature.codes is not None and feature.codes != tuple(range(int(feature.low), int(feature.high) + 1))
+]
+
+
+def encode_record(data):
+    """Returns a float64 feature vector in FEATURE_COLUMNS order from a dict of values."""
+    missing = [column for column in FEATURE_COLUMNS if column not in data]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    return np.array([data[column] for column in FEATURE_COLUMNS], dtype=np.float64)
+
+
+def feature_labels(feature, translations):
+    """Returns the display labels of a categorical feature's codes, in code order."""
+    if feature.labels is None:
+        return [str(code) for code in feature.codes]
+    if isinstance(feature.labels, tuple):
+        return [translations[key] for key in feature.labels]
+    return list(translations[feature.labels])
+
+
+def compile_labels(catalogs):
+    """Builds {column: {label: code}} from an iterable of translation catalogs.
+
+    Labels from every catalog are merged, so a file may use any language's wording.
+    Raises ValueError if two catalogs give the same label different codes.
+    """
+    tables = {feature.name: {} for feature in FEATURES if feature.codes is not None}
+    for translations in catalogs:
+        for feature in FEATURES:
+            if feature.codes is None:
+                continue
+            table = tables[feature.name]
+            for label, code in zip(feature_labels(feature, translations), feature.codes, strict=True):
+                if table.setdefault(label.strip().casefold(), code) != code:
+                    raise ValueError(f"{feature.name}: label {label!r} is used for more than one code")
+    return tables
+
+
+@functools.lru_cache(maxsize=None)
+def load_label_codes(locales_dir=DEFAULT_LOCALES_DIR):
+    """Returns compile_labels() over every catalog in locales_dir, built once per process."""
+    catalogs = []
+    for path in sorted(glob.glob(os.path.join(locales_dir, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            catalogs.append(json.load(f))
+    return compile_labels(catalogs)
+
+
+def _encode_column(name, values, labels):
+    values = np.asarray(values)
+    try:
+        return values.astype(np.float64)
+    except (TypeError, ValueError):
+        pass
+    table = labels.get(name) if labels else None
+    if table is None:
+        raise ValueError(f"column {name}: values must be numeric")
+    # Look up each distinct label once, then scatter the codes back to the rows.
+    unique, inverse = np.unique(values.astype(str), return_inverse=True)
+    codes = np.empty(len(unique), dtype=np.float64)
+    for i, label in enumerate(unique):
+        key = label.strip().casefold()
+        if key in table:
+            codes[i] = table[key]
+        else:
+            try:
+                codes[i] = float(label)
+            except ValueError:
+                raise ValueError(f"column {name}: unknown value {str(label)!r}") from None
+    return codes[inverse.reshape(-1)]
+
+
+def encode_columns(columns, labels=None, validate=True, first_row=0):
+    """Returns a float64 (rows, 13) matrix from columns of raw values.
+
+    columns is a mapping of column name to a sequence (a dict of lists, a DataFrame).
+    Numeric columns are converted directly; text in a categorical column is looked up
+    in labels (see load_label_codes), so either codes or localized labels are accepted.
+    Unless validate is false, the matrix is checked with validate_matrix(), numbering
+    rows from first_row.
+    """
+    missing = [column for column in FEATURE_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    X = np.column_stack([_encode_column(column, columns[column], labels) for column in FEATURE_COLUMNS])
+    if validate:
+        validate_matrix(X, first_row)
+    return X
+
+
+def invalid_mask(X):
+    """Returns a boolean array shaped like X marking each value the schema does not accept.
+
+    A value is invalid if it is missing (NaN), outside the feature's range, fractional
+    for an integer feature, or not one of a categorical feature's codes.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        bad = ~((X >= _LOW) & (X <= _HIGH))
+        bad |= _INTEGER & (X != np.floor(X))
+    for i, codes in _SPARSE_CODES:
+        bad[:, i] |= ~np.isin(X[:, i], codes)
+    return bad
+
+
+def validate_matrix(X, first_row=0, limit=3):
+    """Raises ValueError describing up to limit invalid values in X; returns X if it is valid.
+
+    Row numbers in the message are counted from first_row, for callers validating a
+    file chunk by chunk.
+    """
+    bad = invalid_mask(X)
+    if not bad.any():
+        return X
+    rows, cols = np.nonzero(bad)
+    problems = [
+        f"row {first_row + row + 1}, {FEATURE_COLUMNS[col]}={X[row, col]:g} "
+        f"(expected {'an integer in ' if FEATURES[col].dtype is int else ''}{FEATURES[col].low:g}..{FEATURES[col].high:g})"
+        for row, col in zip(rows[:limit], cols[:limit])
+    ]
+    more = len(rows) - len(problems)
+    raise ValueError("invalid values: " + "; ".join(problems) + (f" and {more} more" if more else ""))
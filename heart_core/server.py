@@ -0,0 +1,194 @@
+"""Local JSON scoring endpoint with micro-batching, built on asyncio streams.
+
+    python -m heart_core serve [--port 8765] [--max-batch 64] [--max-wait-ms 2]
+
+``POST /predict`` takes the 13-feature object ``predict_risk`` uses, or
+``{"instances": [...]}`` for a batch. Concurrent requests are coalesced into
+micro-batches of up to ``max_batch`` rows, waiting at most ``max_wait_ms`` for a
+batch to fill, and each micro-batch is scored as one matrix. ``GET /metrics``
+reports latency percentiles and throughput; ``GET /healthz`` reports readiness.
+Everything runs offline against the bundled model.
+"""
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from heart_core.metrics import RollingStats
+from heart_core.schema import FEATURE_COLUMNS, encode_columns, load_label_codes
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into single matrix evaluations."""
+
+    def __init__(self, engine, max_batch=64, max_wait=0.002):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_rows = RollingStats()
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def score(self, X):
+        """Scores the rows of X as part of the next micro-batch; returns (labels, confidences)."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            rows = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                rows += len(item[0])
+
+            try:
+                labels, confidences = self.engine.score(np.concatenate([X for X, _ in items]))
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batch_rows.add(rows)
+            start = 0
+            for X, future in items:
+                end = start + len(X)
+                if not future.done():
+                    future.set_result((labels[start:end], confidences[start:end]))
+                start = end
+
+
+class ScoringServer:
+    """HTTP/1.1 server (keep-alive, JSON only) in front of a MicroBatcher."""
+
+    def __init__(self, engine, host="127.0.0.1", port=8765, max_batch=64, max_wait=0.002):
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(engine, max_batch=max_batch, max_wait=max_wait)
+        self.latency = RollingStats()
+        self.rows_scored = 0
+        self._server = None
+
+    async def start(self):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    def metrics(self):
+        """Returns latency percentiles, throughput and micro-batch sizes."""
+        latency = self.latency.summary(percentiles=(50, 90, 99))
+        elapsed = max(time.monotonic() - self.latency.started, 1e-9)
+        return {
+            'requests': latency['count'],
+            'requests_per_sec': latency['rate_per_sec'],
+            'rows_per_sec': self.rows_scored / elapsed,
+            'latency_ms': {q: latency[q] * 1000 for q in ('p50', 'p90', 'p99') if latency[q] is not None},
+            'batch_rows': self.batcher.batch_rows.summary(percentiles=(50, 99)),
+            'max_batch': self.batcher.max_batch,
+            'max_wait_ms': self.batcher.max_wait * 1000,
+        }
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if path == "/healthz":
+            return 200, {'status': "ok"}
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path != "/predict":
+            return 404, {'error': f"unknown path {path}"}
+        if method != "POST":
+            return 405, {'error': "use POST"}
+
+        start = time.perf_counter()
+        try:
+            payload = json.loads(body)
+            batch = isinstance(payload, dict) and "instances" in payload
+            instances = payload["instances"] if batch else [payload]
+            columns = {column: [instance[column] for instance in instances] for column in FEATURE_COLUMNS}
+            X = encode_columns(columns, labels=load_label_codes())
+        except KeyError as e:
+            return 400, {'error': f"missing column: {e.args[0]}"}
+        except (ValueError, TypeError) as e:
+            return 400, {'error': str(e)}
+        labels, confidences = await self.batcher.score(X)
+        predictions = [
+            {'is_high_risk': bool(label == 1), 'confidence': float(confidence)}
+            for label, confidence in zip(labels, confidences)
+        ]
+        self.latency.add(time.perf_counter() - start)
+        self.rows_scored += len(X)
+        return 200, {'predictions': predictions} if batch else predictions[0]
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
@@ -0,0 +1,139 @@
+"""Shadow scoring: trial models scored alongside the primary one without affecting it.
+
+Every batch the inference batcher scores is also handed to each shadow model, after
+the primary results have been returned. Each shadow has its own worker thread, so a
+slow or still-loading shadow cannot hold up the others, and must finish within the
+latency budget of the batch; a task that starts or finishes late, or that finds the
+shadow's queue full, is dropped and counted. Label
+agreement and the gap in predicted risk are accumulated per shadow and logged.
+
+Shadows are configured with ``HEART_SHADOW_MODELS`` (comma-separated artifact or
+pickle paths) and ``HEART_SHADOW_BUDGET_MS`` (default 50).
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from heart_core.metrics import RollingStats
+from heart_core.model import get_registry
+
+logger = logging.getLogger(__name__)
+
+LOG_EVERY = 1000
+
+
+class ShadowStats:
+    """Agreement, drop and latency counters for one shadow model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.agreements = 0
+        self.dropped = 0
+        self.errors = 0
+        self.abs_risk_diff_total = 0.0
+        self.max_abs_risk_diff = 0.0
+        self.latency = RollingStats(2048)
+
+    def count_drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def count_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def record(self, agreements, rows, abs_diff, seconds):
+        with self._lock:
+            self.rows += rows
+            self.agreements += agreements
+            self.abs_risk_diff_total += float(abs_diff.sum())
+            self.max_abs_risk_diff = max(self.max_abs_risk_diff, float(abs_diff.max()))
+        self.latency.add(seconds)
+
+    def summary(self):
+        with self._lock:
+            rows = self.rows
+            return {
+                'rows': rows,
+                'agreement_rate': self.agreements / rows if rows else None,
+                'disagreements': rows - self.agreements,
+                'mean_abs_risk_diff': self.abs_risk_diff_total / rows if rows else None,
+                'max_abs_risk_diff': self.max_abs_risk_diff,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'latency_p95_seconds': self.latency.percentile(95),
+            }
+
+
+class ShadowScorer:
+    """Scores batches against shadow models on worker threads under a deadline."""
+
+    def __init__(self, registries, budget=0.05, max_pending=16):
+        self.registries = dict(registries)
+        self.budget = budget
+        self._pools = {name: ThreadPoolExecutor(1, thread_name_prefix="heart-shadow") for name in self.registries}
+        # Bounds queued work: when a shadow falls behind, new batches are dropped, not queued.
+        self._slots = {name: threading.BoundedSemaphore(max_pending) for name in self.registries}
+        self._stats = {name: ShadowStats() for name in self.registries}
+        # Load each shadow on its own worker, off the primary request path.
+        for name, registry in self.registries.items():
+            self._pools[name].submit(registry.get_engine)
+
+    def observe(self, X, labels, confidences):
+        """Queues X for every shadow, to be compared with the primary labels and confidences."""
+        deadline = time.monotonic() + self.budget
+        primary_risk = np.where(labels == 1, confidences, 1.0 - confidences)
+        for name, registry in self.registries.items():
+            if not self._slots[name].acquire(blocking=False):
+                self._drop(name, "queue full")
+                continue
+            self._pools[name].submit(self._score, name, registry, X, labels, primary_risk, deadline)
+
+    def _score(self, name, registry, X, labels, primary_risk, deadline):
+        try:
+            start = time.monotonic()
+            if start > deadline:
+                self._drop(name, "queued past deadline")
+                return
+            engine = registry.get_engine()
+            shadow_risk = engine.risk(X)
+            shadow_labels = np.where(shadow_risk > 0.5, 1, 0)
+            finished = time.monotonic()
+            if finished > deadline:
+                self._drop(name, f"took {(finished - start) * 1000:.1f} ms")
+                return
+            agree = shadow_labels == labels
+            stats = self._stats[name]
+            stats.record(int(agree.sum()), len(agree), np.abs(shadow_risk - primary_risk), finished - start)
+            for i in np.flatnonzero(~agree):
+                logger.info("shadow %s disagrees: primary risk %.3f, shadow risk %.3f",
+                            name, primary_risk[i], shadow_risk[i])
+            if stats.rows // LOG_EVERY != (stats.rows - len(agree)) // LOG_EVERY:
+                logger.info("shadow %s: %s", name, stats.summary())
+        except Exception:
+            self._stats[name].count_error()
+            logger.exception("shadow %s failed", name)
+        finally:
+            self._slots[name].release()
+
+    def _drop(self, name, reason):
+        self._stats[name].count_drop()
+        logger.debug("shadow %s dropped a batch: %s", name, reason)
+
+    def stats(self):
+        """Returns {shadow name: summary} for every shadow model."""
+        return {name: stats.summary() for name, stats in self._stats.items()}
+
+
+def shadow_scorer_from_env():
+    """Returns a ShadowScorer for $HEART_SHADOW_MODELS, or None if no shadows are configured."""
+    paths = [path.strip() for path in os.environ.get("HEART_SHADOW_MODELS", "").split(",") if path.strip()]
+    if not paths:
+        return None
+    budget = float(os.environ.get("HEART_SHADOW_BUDGET_MS", "50")) / 1000
+    return ShadowScorer({os.path.basename(path): get_registry(path) for path in paths}, budget=budget)
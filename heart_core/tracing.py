@@ -0,0 +1,200 @@
+"""Per-rerun timing spans with rolling percentiles and Prometheus text export.
+
+Wrap each phase of a rerun in ``tracer.span(phase)`` inside ``tracer.rerun(page)``.
+When the tracer is disabled, ``span`` returns a shared no-op context manager, so
+instrumented code pays one attribute check per phase. Script runs are also counted
+per page and kind (``full`` for a whole-script rerun, ``fragment`` for a rerun of a
+single ``st.fragment``); the counters are always on.
+
+Tracing is off unless ``HEART_TRACING=1`` is set or it is switched on from the
+diagnostics section. With ``HEART_METRICS_FILE`` set, the Prometheus text is
+rewritten there at most every ``HEART_METRICS_INTERVAL`` seconds (default 15).
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from heart_core.metrics import RollingStats
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (50, 95, 99)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "phase", "start")
+
+    def __init__(self, tracer, phase):
+        self.tracer = tracer
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+class _Rerun(_Span):
+    __slots__ = ("page",)
+
+    def __init__(self, tracer, page, phase):
+        super().__init__(tracer, phase)
+        self.page = page
+
+    def __enter__(self):
+        self.tracer._local.page = self.page
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        super().__exit__(*exc_info)
+        self.tracer._local.page = None
+        self.tracer.maybe_export()
+        return False
+
+
+class Tracer:
+    """Collects span durations per (page, phase) for the whole server process."""
+
+    def __init__(self, enabled=False, window=2048, metrics_file=None, export_interval=15.0):
+        self.enabled = enabled
+        self.window = window
+        self.metrics_file = metrics_file
+        self.export_interval = export_interval
+        self._stats = {}
+        self._runs = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_export = 0.0
+
+    def rerun(self, page, phase="rerun"):
+        """Returns a context manager timing one script run of page, recorded as phase."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Rerun(self, page, phase)
+
+    def count_run(self, page, kind):
+        """Counts one script run of page; kind is 'full' or 'fragment'."""
+        with self._lock:
+            self._runs[page, kind] = self._runs.get((page, kind), 0) + 1
+
+    def run_counts(self):
+        """Returns {(page, kind): number of runs}."""
+        with self._lock:
+            return dict(sorted(self._runs.items()))
+
+    def span(self, phase):
+        """Returns a context manager timing one phase of the current rerun."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, phase)
+
+    def record(self, phase, seconds):
+        """Adds one duration for phase on the page of the current rerun."""
+        key = (getattr(self._local, "page", None) or "none", phase)
+        stats = self._stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(key, RollingStats(self.window))
+        stats.add(seconds)
+
+    def summary(self):
+        """Returns {(page, phase): {'count', 'mean', 'p50', 'p95', 'p99'}} in seconds."""
+        with self._lock:
+            items = sorted(self._stats.items())
+        result = {}
+        for key, stats in items:
+            summary = stats.summary(QUANTILES)
+            del summary['rate_per_sec']
+            result[key] = summary
+        return result
+
+    def reset(self):
+        """Drops all recorded spans and run counts."""
+        with self._lock:
+            self._stats = {}
+            self._runs = {}
+
+    def prometheus_text(self):
+        """Returns the spans as a Prometheus summary in the text exposition format."""
+        lines = [
+            "# HELP heart_rerun_phase_seconds Time spent in each phase of a Streamlit rerun.",
+            "# TYPE heart_rerun_phase_seconds summary",
+        ]
+        with self._lock:
+            items = sorted(self._stats.items())
+        for (page, phase), stats in items:
+            labels = f'page="{page}",phase="{phase}"'
+            for q in QUANTILES:
+                value = stats.percentile(q)
+                if value is not None:
+                    lines.append(f'heart_rerun_phase_seconds{{{labels},quantile="{q / 100:g}"}} {value:.9f}')
+            lines.append(f"heart_rerun_phase_seconds_sum{{{labels}}} {stats.total:.9f}")
+            lines.append(f"heart_rerun_phase_seconds_count{{{labels}}} {stats.count}")
+        lines += [
+            "# HELP heart_reruns_total Script runs per page, whole-script (full) or of one fragment.",
+            "# TYPE heart_reruns_total counter",
+        ]
+        for (page, kind), count in self.run_counts().items():
+            lines.append(f'heart_reruns_total{{page="{page}",kind="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomically replaces path with the current Prometheus text."""
+        # A temporary file of its own per writer, in the same directory so the rename is atomic.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".heart_metrics_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.prometheus_text())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def maybe_export(self):
+        """Writes the metrics file if one is configured and the interval has passed.
+
+        Runs at the end of every traced rerun, so at most one session claims each
+        export and a failed write is logged rather than raised into the page.
+        """
+        if not self.metrics_file:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < self.export_interval:
+                return
+            self._last_export = now
+        try:
+            self.write_prometheus(self.metrics_file)
+        except OSError:
+            logger.exception("could not write metrics to %s", self.metrics_file)
+
+
+_tracer = Tracer(
+    enabled=os.environ.get("HEART_TRACING") == "1",
+    metrics_file=os.environ.get("HEART_METRICS_FILE"),
+    export_interval=float(os.environ.get("HEART_METRICS_INTERVAL", "15")),
+)
+
+
+def get_tracer():
+    """Returns the tracer shared by every session in this process."""
+    return _tracer
@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import os
+import pickle
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heart_core.artifact import FORMAT_VERSION, export_artifact, load_artifact, read_header
+from heart_core.model import ModelRegistry, default_model_path
+from heart_core.schema import FEATURE_COLUMNS, FEATURE_RANGES
+
+
+def frame(rows, seed=0):
+    lows, highs = zip(*(FEATURE_RANGES[column] for column in FEATURE_COLUMNS))
+    return pd.DataFrame(np.random.default_rng(seed).uniform(lows, highs, (rows, len(lows))), columns=FEATURE_COLUMNS)
+
+
+@pytest.fixture(scope="module")
+def model():
+    from sklearn.linear_model import LogisticRegression
+
+    X = frame(400)
+    return LogisticRegression(max_iter=5000).fit(X, (X['chol'] > 350).astype(int))
+
+
+@pytest.fixture
+def artifact(model, tmp_path):
+    path = str(tmp_path / "model.bin")
+    export_artifact(model, path, metadata={"note": "test"})
+    return path
+
+
+def test_round_trip(model, artifact):
+    loaded = load_artifact(artifact)
+    X = frame(1000, seed=1)
+    assert np.allclose(loaded.predict_proba(X.to_numpy()), model.predict_proba(X), rtol=0, atol=1e-12)
+    assert (loaded.predict(X.to_numpy()) == model.predict(X)).all()
+    assert list(loaded.feature_names_in_) == FEATURE_COLUMNS
+    assert loaded.metadata == {"note": "test"} == read_header(artifact)["metadata"]
+
+
+def test_export_rejects_non_linear_models(tmp_path):
+    from sklearn.tree import DecisionTreeClassifier
+
+    X = frame(50)
+    tree = DecisionTreeClassifier().fit(X, (X['age'] > 60).astype(int))
+    with pytest.raises(ValueError, match="only binary linear models"):
+        export_artifact(tree, str(tmp_path / "tree.bin"))
+
+
+def rewrite(path, edit):
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    edit(data)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_wrong_version_is_rejected(artifact):
+    rewrite(artifact, lambda data: struct.pack_into("<I", data, 8, FORMAT_VERSION + 1))
+    with pytest.raises(ValueError, match=f"unsupported artifact version {FORMAT_VERSION + 1}"):
+        load_artifact(artifact)
+
+
+@pytest.mark.parametrize("keep", [4, 40, -1])
+def test_truncated_file_is_rejected(artifact, keep):
+    rewrite(artifact, lambda data: data.__delitem__(slice(keep, None)))
+    with pytest.raises(ValueError, match="truncated|wrong size"):
+        load_artifact(artifact)
+
+
+def test_payload_corruption_is_rejected(artifact):
+    rewrite(artifact, lambda data: data.__setitem__(-40, data[-40] ^ 1))
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        load_artifact(artifact)
+
+
+def test_header_corruption_is_rejected(artifact):
+    def edit(data):
+        start = data.index(b'"note": "test"')
+        data[start + 9:start + 13] = b"TEST"
+
+    rewrite(artifact, edit)
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        load_artifact(artifact)
+
+
+def test_registry_only_unpickles_pkl_files(model, tmp_path):
+    for name in ("model.pkl", "model.bin"):
+        with open(tmp_path / name, "wb") as f:
+            pickle.dump(model, f)
+    assert ModelRegistry(str(tmp_path / "model.pkl")).get().coef_.shape == (1, len(FEATURE_COLUMNS))
+    with pytest.raises(ValueError, match="only .pkl files are unpickled"):
+        ModelRegistry(str(tmp_path / "model.bin")).get()
+
+
+def test_default_model_path_falls_back_to_a_current_pickle(model, tmp_path, caplog):
+    pickle_path, artifact_path = str(tmp_path / "model.pkl"), str(tmp_path / "model.bin")
+    with open(pickle_path, "wb") as f:
+        pickle.dump(model, f)
+    with open(pickle_path, "rb") as f:
+        export_artifact(model, artifact_path, metadata={"source_sha256": hashlib.file_digest(f, "sha256").hexdigest()})
+    assert default_model_path(artifact_path, pickle_path) == artifact_path
+
+    # Replace the pickle (as a hot reload would), with a different size so the stat signature changes.
+    with open(pickle_path, "ab") as f:
+        f.write(b"\0")
+    with caplog.at_level(logging.WARNING, logger="heart_core.model"):
+        assert default_model_path(artifact_path, pickle_path) == pickle_path
+    assert "was not exported from the current" in caplog.text
+
+    os.remove(pickle_path)
+    assert default_model_path(artifact_path, pickle_path) == artifact_path
@@ -0,0 +1,35 @@
+import io
+import json
+
+import pytest
+
+import heart_core
+from heart_core.cli import score_jsonl
+
+ROW = {
+    'age': 54, 'sex': "Male", 'cp': 2, 'trestbps': 130, 'chol': 246, 'fbs': 0, 'restecg': 1,
+    'thalach': 150, 'exang': 0, 'oldpeak': 1.0, 'slope': 1, 'ca': 0, 'thal': 2,
+}
+
+
+def score(lines):
+    out = io.StringIO()
+    rows = score_jsonl(heart_core.get_registry().get_engine(), lines, out, chunk_size=2)
+    return rows, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_score_jsonl_skips_blank_lines():
+    rows, records = score([json.dumps(ROW) + "\n", "\n", json.dumps(dict(ROW, id=7)) + "\n"])
+    assert rows == 2
+    assert records[1]['id'] == 7
+    assert {'is_high_risk', 'confidence'} <= records[0].keys()
+
+
+@pytest.mark.parametrize("line, message", [
+    ("[1, 2]", "line 3: expected a JSON object, got list"),
+    ("42", "line 3: expected a JSON object, got int"),
+    ("{bad", "line 3: invalid JSON"),
+])
+def test_score_jsonl_names_the_bad_line(line, message):
+    with pytest.raises(ValueError, match=message.replace("[", r"\[")):
+        score([json.dumps(ROW), "", line])
@@ -0,0 +1,97 @@
+import pytest
+
+from heart_core.history import HistoryStore
+
+DATA = {
+    'age': 54, 'sex': 1, 'cp': 2, 'trestbps': 130, 'chol': 246, 'fbs': 0, 'restecg': 1,
+    'thalach': 150, 'exang': 0, 'oldpeak': 1.0, 'slope': 1, 'ca': 0, 'thal': 2,
+}
+
+
+def record(username, day, second=0, is_high_risk=False):
+    return {
+        'username': username,
+        'timestamp': f"2026-10-{day:02d} 10:00:{second:02d}",
+        'is_high_risk': is_high_risk,
+        'confidence': 0.75,
+        'data': dict(DATA, age=20 + day),
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Large batch and interval: nothing is written unless a read flushes it.
+    store = HistoryStore(str(tmp_path / "history.db"), batch_size=1000, flush_interval=3600)
+    yield store
+    store.close()
+
+
+def test_reads_flush_queued_records(store):
+    store.append(record("amna", 1))
+    assert store._pending
+    assert store.count("amna") == 1
+    assert not store._pending
+    store.append(record("amna", 2))
+    assert [r['timestamp'] for r in store.page("amna")] == ["2026-10-02 10:00:00", "2026-10-01 10:00:00"]
+    store.append(record("amna", 3))
+    assert len(list(store.iter_records("amna"))) == 3
+
+
+def test_filters(store):
+    for day in range(1, 11):
+        store.append(record("amna", day, is_high_risk=day % 2 == 0))
+    store.append(record("other", 5, is_high_risk=True))
+
+    assert store.count() == 11
+    assert store.count("amna") == 10
+    assert store.count("amna", start="2026-10-03", end="2026-10-06") == 3
+    assert store.count("amna", is_high_risk=True) == 5
+    assert store.count("amna", start="2026-10-03", end="2026-10-06", is_high_risk=True) == 1
+    assert {r['username'] for r in store.page(is_high_risk=True, limit=100)} == {"amna", "other"}
+    chunks = list(store.iter_feature_chunks("amna", chunk_size=4, is_high_risk=False))
+    assert [len(chunk) for chunk in chunks] == [4, 1]
+
+
+def test_pages_are_newest_first_and_disjoint(store):
+    # Same timestamp twice: the later insert sorts first.
+    for second in (0, 1, 2, 2, 3):
+        store.append(record("amna", 1, second))
+    pages = [store.page("amna", offset, 2) for offset in (0, 2, 4)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    ordered = [r for page in pages for r in page]
+    assert [r['timestamp'][-2:] for r in ordered] == ["03", "02", "02", "01", "00"]
+    assert ordered[1]['id'] > ordered[2]['id']
+    assert len({r['id'] for r in ordered}) == 5
+    assert [r['id'] for r in store.iter_records("amna", chunk_size=2)] == [r['id'] for r in ordered]
+
+
+def test_clear_one_user_keeps_the_others(store):
+    store.append(record("amna", 1, is_high_risk=True))
+    store.append(record("other", 1))
+    store.clear("amna")
+    assert store.count("amna") == 0
+    assert store.count("other") == 1
+    assert store.cohort("amna").total == 0
+    assert store.cohort("other").total == 1
+    store.clear()
+    assert store.count() == 0
+
+
+def test_first_login_claims_a_name(store):
+    assert store.authenticate("amna", "amna@example.com", "secret")
+    assert store.authenticate("amna", " Amna@Example.com ", "secret")
+    assert not store.authenticate("amna", "amna@example.com", "guess")
+    assert not store.authenticate("amna", "someone@example.com", "secret")
+    assert store.authenticate("other", "someone@example.com", "guess")
+
+
+def test_accounts_survive_clear_and_reopen(store, tmp_path):
+    store.authenticate("amna", "amna@example.com", "secret")
+    store.clear()
+    store.close()
+    reopened = HistoryStore(str(tmp_path / "history.db"))
+    try:
+        assert not reopened.authenticate("amna", "amna@example.com", "guess")
+        assert reopened.authenticate("amna", "amna@example.com", "secret")
+    finally:
+        reopened.close()
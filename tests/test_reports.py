@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from heart_core import schema
+from heart_core.reports import FEATURE_LABELS, REPORT_TEXT, ReportRenderer, render_pdf, report_labels
+
+RECORD = {
+    'username': "अमना", 'timestamp': "2026-10-12 10:00:00", 'is_high_risk': True, 'confidence': 0.8,
+    'data': {
+        'age': 54, 'sex': 1, 'cp': 2, 'trestbps': 130, 'chol': 246, 'fbs': 0, 'restecg': 1,
+        'thalach': 150, 'exang': 0, 'oldpeak': 1.0, 'slope': 1, 'ca': 0, 'thal': 2,
+    },
+}
+
+
+def catalog(language):
+    with open(f"{schema.DEFAULT_LOCALES_DIR}/{language}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(autouse=True)
+def builtin_font(monkeypatch):
+    from heart_core.reports import pdf_fonts
+
+    monkeypatch.delenv("HEART_PDF_FONT", raising=False)
+    pdf_fonts.cache_clear()
+    yield
+    pdf_fonts.cache_clear()
+
+
+def test_latin_script_catalog_labels_the_report():
+    spanish = catalog('Spanish')
+    labels = dict(report_labels(spanish))
+    assert labels['report_header'] == spanish['report_header']
+    assert labels['thalach'] == spanish['thalach']
+
+
+def test_language_the_font_cannot_draw_falls_back_to_english():
+    english = {**REPORT_TEXT, **FEATURE_LABELS}
+    assert dict(report_labels(catalog('Hindi'))) == english
+    assert dict(report_labels()) == english
+
+
+def test_report_renders_in_every_language():
+    for language in ("English", "Hindi", "Spanish"):
+        pdf = render_pdf(RECORD, report_labels(catalog(language)))
+        assert pdf.startswith(b"%PDF"), language
+
+
+def test_renderer_caches_each_language_separately():
+    renderer = ReportRenderer(max_workers=1)
+    english = renderer.get(RECORD, catalog('English'))
+    assert renderer.get(RECORD, catalog('Spanish')) != english
+    assert renderer.submit(RECORD, catalog('English')).result() is english
+    assert len(renderer._futures) == 2
@@ -0,0 +1,95 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from heart_core import schema
+from heart_core.schema import FEATURE_COLUMNS, compile_labels, encode_columns, invalid_mask, load_label_codes
+
+ROW = {
+    'age': 54, 'sex': 1, 'cp': 2, 'trestbps': 130, 'chol': 246, 'fbs': 0, 'restecg': 1,
+    'thalach': 150, 'exang': 0, 'oldpeak': 1.0, 'slope': 1, 'ca': 0, 'thal': 2,
+}
+
+
+def columns(rows):
+    return {column: [row[column] for row in rows] for column in FEATURE_COLUMNS}
+
+
+def catalog(language):
+    with open(f"{schema.DEFAULT_LOCALES_DIR}/{language}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_encode_columns_in_feature_order():
+    X = encode_columns(columns([ROW, dict(ROW, age=61)]))
+    assert X.shape == (2, 13)
+    assert X[1].tolist() == [dict(ROW, age=61)[column] for column in FEATURE_COLUMNS]
+
+
+@pytest.mark.parametrize("column, value", [
+    ('chol', math.nan),   # missing
+    ('age', 121),         # above range
+    ('trestbps', 49),     # below range
+    ('cp', 1.5),          # fractional code
+    ('thal', 3),          # not one of the codes
+])
+def test_invalid_mask_flags_one_value(column, value):
+    X = encode_columns(columns([ROW, dict(ROW, **{column: value})]), validate=False)
+    bad = invalid_mask(X)
+    assert np.argwhere(bad).tolist() == [[1, FEATURE_COLUMNS.index(column)]]
+
+
+def test_fractional_continuous_value_is_accepted():
+    assert not invalid_mask(encode_columns(columns([dict(ROW, oldpeak=2.3)]), validate=False)).any()
+
+
+def test_validation_error_numbers_rows_from_first_row():
+    rows = [ROW] * 3 + [dict(ROW, age=0)] + [ROW] + [dict(ROW, ca=7)]
+    with pytest.raises(ValueError) as error:
+        encode_columns(columns(rows), first_row=100)
+    message = str(error.value)
+    assert "row 104, age=0" in message
+    assert "row 106, ca=7" in message
+
+
+def test_validation_error_is_capped():
+    with pytest.raises(ValueError, match=r"and 2 more$"):
+        encode_columns(columns([dict(ROW, age=200)] * 5))
+
+
+def test_labels_from_every_locale():
+    labels = load_label_codes()
+    for language in ("English", "Hindi", "Spanish"):
+        translations = catalog(language)
+        rows = [dict(ROW, sex=translations['female'], cp=translations['cp_options'][3]),
+                dict(ROW, sex=translations['male'].upper(), thal=f" {translations['thal_options'][0]} ")]
+        X = encode_columns(columns(rows), labels)
+        sex, cp, thal = (FEATURE_COLUMNS.index(column) for column in ('sex', 'cp', 'thal'))
+        assert X[:, sex].tolist() == [0, 1], language
+        assert X[0, cp] == 3 and X[1, thal] == 0, language
+
+
+def test_text_codes_fall_back_to_numbers():
+    labels = load_label_codes()
+    X = encode_columns(columns([dict(ROW, sex="Male", ca="0"), dict(ROW, sex="0", ca="3")]), labels)
+    assert X[:, FEATURE_COLUMNS.index('sex')].tolist() == [1, 0]
+    assert X[:, FEATURE_COLUMNS.index('ca')].tolist() == [0, 3]
+
+
+def test_unknown_label_is_rejected():
+    with pytest.raises(ValueError, match="column sex: unknown value 'Maybe'"):
+        encode_columns(columns([dict(ROW, sex="Maybe")]), load_label_codes())
+
+
+def test_text_without_labels_is_rejected():
+    with pytest.raises(ValueError, match="column sex: values must be numeric"):
+        encode_columns(columns([dict(ROW, sex="Male")]))
+
+
+def test_compile_labels_rejects_conflicting_catalogs():
+    english = catalog('English')
+    swapped = dict(english, female=english['male'], male=english['female'])
+    with pytest.raises(ValueError, match="used for more than one code"):
+        compile_labels([english, swapped])
@@ -0,0 +1,106 @@
+import io
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import heart_core
+from heart_core.schema import FEATURE_COLUMNS, FEATURES
+
+ROW = {
+    'age': 54, 'sex': "Male", 'cp': 2, 'trestbps': 130, 'chol': 246, 'fbs': 0, 'restecg': 1,
+    'thalach': 150, 'exang': 0, 'oldpeak': 1.0, 'slope': 1, 'ca': 0, 'thal': 2,
+}
+
+
+
+def random_rows(n, seed=0):
+    """Returns n rows drawn uniformly from each feature's accepted range or codes."""
+    rng = np.random.default_rng(seed)
+    columns = []
+    for feature in FEATURES:
+        if feature.codes is not None:
+            columns.append(rng.choice(feature.codes, n))
+        elif feature.dtype is int:
+            columns.append(rng.integers(feature.low, feature.high, n, endpoint=True))
+        else:
+            columns.append(rng.uniform(feature.low, feature.high, n).round(1))
+    return np.column_stack(columns).astype(np.float64)
+
+
+def sklearn_reference(model, X):
+    frame = pd.DataFrame(X, columns=FEATURE_COLUMNS)[list(model.feature_names_in_)]
+    probabilities = model.predict_proba(frame)
+    return model.predict(frame), probabilities
+
+
+# The shipped pickle was written by an older scikit-learn; unpickling it is the point here.
+@pytest.mark.filterwarnings("ignore:Trying to unpickle")
+def test_linear_path_matches_logistic_regression():
+    with open(heart_core.DEFAULT_PICKLE_PATH, "rb") as f:
+        model = pickle.load(f)
+    engine = heart_core.ScoringEngine(model)
+    assert engine.is_linear
+    X = random_rows(2000)
+
+    labels, confidences = engine.score(X)
+    expected_labels, probabilities = sklearn_reference(model, X)
+
+    assert (labels == expected_labels).all()
+    assert np.allclose(confidences, probabilities.max(axis=1), rtol=0, atol=1e-12)
+    high = list(model.classes_).index(1)
+    assert np.allclose(engine.risk(X), probabilities[:, high], rtol=0, atol=1e-12)
+
+
+def test_linear_path_follows_training_column_order():
+    from sklearn.linear_model import LogisticRegression
+
+    X = random_rows(500, seed=1)
+    y = (X[:, FEATURE_COLUMNS.index('thalach')] < 150).astype(int)
+    shuffled = FEATURE_COLUMNS[::-1]
+    model = LogisticRegression(max_iter=5000).fit(pd.DataFrame(X, columns=FEATURE_COLUMNS)[shuffled], y)
+    engine = heart_core.ScoringEngine(model)
+    X = random_rows(1000, seed=2)
+
+    labels, confidences = engine.score(X)
+    expected_labels, probabilities = sklearn_reference(model, X)
+
+    assert engine.is_linear
+    assert (labels == expected_labels).all()
+    assert np.allclose(confidences, probabilities.max(axis=1), rtol=0, atol=1e-12)
+    assert np.allclose(engine.risk(X), probabilities[:, 1], rtol=0, atol=1e-12)
+
+
+def test_non_linear_model_falls_back_to_predict_proba():
+    from sklearn.ensemble import RandomForestClassifier
+
+    X = random_rows(500, seed=3)
+    y = (X[:, FEATURE_COLUMNS.index('chol')] > 300).astype(int)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(pd.DataFrame(X, columns=FEATURE_COLUMNS), y)
+    engine = heart_core.ScoringEngine(model)
+    X = random_rows(1000, seed=4)
+
+    labels, confidences = engine.score(X)
+    expected_labels, probabilities = sklearn_reference(model, X)
+
+    assert not engine.is_linear
+    assert (labels == expected_labels).all()
+    assert np.array_equal(confidences, probabilities.max(axis=1))
+    assert np.array_equal(engine.risk(X), probabilities[:, 1])
+
+
+def test_score_csv_in_chunks_with_labels_across_chunks():
+    # Regression: the label lookup table was overwritten by the first chunk's predictions.
+    source = io.StringIO(pd.DataFrame([ROW] * 12).to_csv(index=False))
+    sink = io.StringIO()
+    engine = heart_core.get_registry().get_engine()
+
+    rows = heart_core.score_csv_in_chunks(engine, source, sink, chunk_size=5)
+
+    assert rows == 12
+    scored = pd.read_csv(io.StringIO(sink.getvalue()))
+    assert len(scored) == 12
+    expected = heart_core.predict_risk(engine, dict(ROW, sex=1))
+    assert scored['is_high_risk'].eq(expected[0]).all()
+    assert scored['confidence'].sub(expected[1]).abs().max() < 1e-12